@@ -0,0 +1,161 @@
+import os, glob, mmap, shutil, struct, hashlib, pygame, threading
+from settings import *
+from startup import section
+
+# Shared asset caches. Everything is loaded on first use and then reused, so
+# restarting a level or streaming a chunk back in never decodes a file twice.
+#
+# Scaled, flipped and smooth-scaled images are also kept on disk under
+# ASSET_CACHE_DIR as raw pixel buffers, so later launches memory-map them
+# instead of decoding and resampling the PNG again. A processed file is named
+# by the source path plus transform and by a hash of the source file's bytes,
+# so editing or replacing the sprite pack simply misses the old entries.
+#
+# Stale files are pruned as the cache changes, never on a warm start: writing
+# an entry removes the same image + transform built from older source bytes,
+# and the first write of a run removes everything outside the directory of the
+# current ASSET_CACHE_VERSION.
+
+image_cache = {}
+font_cache = {}
+background_cache = {}
+background_pending = set()
+processed_cache = {}
+source_hashes = {}
+cache_swept = False
+
+# Bump when the processing below changes so old cache files are ignored
+ASSET_CACHE_VERSION = 1
+# Magic, width, height, bytes per pixel; the pixels follow
+PROCESSED_HEADER = struct.Struct('<4sHHB')
+PROCESSED_MAGIC = b'GABE'
+
+def load_image(path):
+    if path not in image_cache:
+        with section('asset decode'):
+            image_cache[path] = pygame.image.load(path).convert_alpha()
+    return image_cache[path]
+
+def source_hash(path):
+    if path not in source_hashes:
+        with open(path, 'rb') as f:
+            source_hashes[path] = hashlib.sha1(f.read()).hexdigest()
+    return source_hashes[path]
+
+def version_dir():
+    return os.path.join(ASSET_CACHE_DIR, f'v{ASSET_CACHE_VERSION}')
+
+def processed_path(path, size, flip, smooth, alpha):
+    # <hash of path + transform>-<hash of source bytes>.raw
+    transform = f'{size[0]}x{size[1]} flip={flip} smooth={smooth} alpha={alpha}'
+    entry = hashlib.sha1(f'{path} {transform}'.encode()).hexdigest()
+    return os.path.join(version_dir(), f'{entry}-{source_hash(path)}.raw')
+
+def read_processed(cache_path, alpha):
+    # frombuffer() wraps the mapped pixels without copying; convert() makes the one copy we keep
+    try:
+        with open(cache_path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None # Missing or empty
+    try:
+        magic, width, height, channels = PROCESSED_HEADER.unpack_from(mapped)
+        if magic != PROCESSED_MAGIC or len(mapped) != PROCESSED_HEADER.size + width * height * channels:
+            return None
+        pixels = memoryview(mapped)[PROCESSED_HEADER.size:]
+        raw = pygame.image.frombuffer(pixels, (width, height), 'RGBA' if channels == 4 else 'RGB')
+        surface = raw.convert_alpha() if alpha else raw.convert()
+        del raw
+        pixels.release()
+        return surface
+    except struct.error:
+        return None
+    finally:
+        mapped.close()
+
+def sweep_cache():
+    # Old-version directories, and files from before the cache was versioned
+    global cache_swept
+    cache_swept = True
+    current = version_dir()
+    for path in glob.glob(os.path.join(ASSET_CACHE_DIR, '*')):
+        if path == current:
+            continue
+        try:
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+        except OSError:
+            pass
+
+def write_processed(cache_path, surface, alpha):
+    if not cache_swept:
+        sweep_cache()
+    os.makedirs(version_dir(), exist_ok=True)
+    width, height = surface.get_size()
+    # Written under a temporary name so a half-written file is never mapped
+    temp_path = f'{cache_path}.{os.getpid()}.{threading.get_ident()}'
+    with open(temp_path, 'wb') as f:
+        f.write(PROCESSED_HEADER.pack(PROCESSED_MAGIC, width, height, 4 if alpha else 3))
+        f.write(pygame.image.tobytes(surface, 'RGBA' if alpha else 'RGB'))
+    os.replace(temp_path, cache_path)
+    # The same image + transform built from older source bytes
+    entry = os.path.basename(cache_path).split('-')[0]
+    for stale in glob.glob(os.path.join(version_dir(), f'{entry}-*.raw')):
+        if stale != cache_path:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+def load_processed(path, size, flip=False, smooth=False, alpha=True):
+    # path scaled to size (smoothscale if smooth), mirrored horizontally if flip.
+    # Shared like load_image(); copy the result before changing it in place.
+    key = (path, size, flip, smooth, alpha)
+    if key not in processed_cache:
+        cache_path = processed_path(path, size, flip, smooth, alpha)
+        with section('asset cache'):
+            surface = read_processed(cache_path, alpha)
+        if surface is None:
+            with section('asset decode'):
+                if alpha:
+                    image = load_image(path)
+                else:
+                    image = pygame.image.load(path).convert()
+                surface = pygame.transform.smoothscale(image, size) if smooth else pygame.transform.scale(image, size)
+                if flip:
+                    surface = pygame.transform.flip(surface, True, False)
+            try:
+                write_processed(cache_path, surface, alpha)
+            except OSError:
+                pass # Read-only checkout: still works, just without the disk cache
+        processed_cache[key] = surface
+    return processed_cache[key]
+
+def get_font(size, bold=False):
+    # SysFont scans the installed fonts on first use, so it's kept off the startup path
+    key = (size, bold)
+    if key not in font_cache:
+        with section('font load'):
+            font_cache[key] = pygame.font.SysFont('Arial', size, bold=bold)
+    return font_cache[key]
+
+def decode_background(bg_file):
+    with section('background decode'):
+        try:
+            # Scaled to screen size using smoothscale to prevent pixelation
+            background_cache[bg_file] = load_processed(f'{BACKGROUND_ASSETS}/{bg_file}', (SCREEN_WIDTH, SCREEN_HEIGHT), smooth=True, alpha=False)
+        except:
+            background_cache[bg_file] = None
+    background_pending.discard(bg_file)
+
+def request_background(bg_file):
+    # Full-screen backgrounds are decoded and scaled on a worker thread; until
+    # they are ready the level is drawn over the plain sky colour
+    if bg_file not in background_cache and bg_file not in background_pending:
+        background_pending.add(bg_file)
+        threading.Thread(target=decode_background, args=(bg_file,), daemon=True).start()
+
+def get_background(bg_file):
+    return background_cache.get(bg_file)
@@ -0,0 +1,85 @@
+import os, pygame
+from settings import *
+from startup import section
+
+# Sound effects are decoded once at startup into a sound bank and played on a
+# fixed pool of mixer channels, so play() never touches the disk mid-frame.
+# Until init() succeeds (headless runs, no audio device) play() does nothing.
+
+EFFECTS = {
+    'bump': 'sfx_bump.ogg',
+    'coin': 'sfx_coin.ogg',
+    'disappear': 'sfx_disappear.ogg',
+    'gem': 'sfx_gem.ogg',
+    'hurt': 'sfx_hurt.ogg',
+    'jump': 'sfx_jump.ogg',
+    'jump_high': 'sfx_jump-high.ogg',
+    'magic': 'sfx_magic.ogg',
+    'select': 'sfx_select.ogg',
+    'throw': 'sfx_throw.ogg',
+}
+
+class SoundBank:
+    def __init__(self):
+        self.sounds = {}
+        self.channels = []
+        self.next_channel = 0
+        self.voices = {} # effect name -> channels it was started on, oldest first
+        self.last_played = {}
+
+    def load(self):
+        try:
+            # Small buffer keeps effect latency low
+            pygame.mixer.pre_init(44100, -16, 2, 512)
+            pygame.mixer.init()
+        except pygame.error:
+            return False
+        pygame.mixer.set_num_channels(SOUND_CHANNELS)
+        self.channels = [pygame.mixer.Channel(i) for i in range(SOUND_CHANNELS)]
+        with section('sound decode'):
+            for name, filename in EFFECTS.items():
+                try:
+                    sound = pygame.mixer.Sound(os.path.join(SOUND_ASSETS, filename))
+                except (pygame.error, FileNotFoundError):
+                    continue
+                sound.set_volume(SOUND_VOLUME)
+                self.sounds[name] = sound
+        return True
+
+    def play(self, name):
+        sound = self.sounds.get(name)
+        if sound is None:
+            return
+
+        # Per-effect cooldown: a burst of coins in one frame is one "ding"
+        now = pygame.time.get_ticks()
+        if now - self.last_played.get(name, -SOUND_COOLDOWN) < SOUND_COOLDOWN:
+            return
+        self.last_played[name] = now
+
+        # Voice limit: retrigger the oldest voice of this effect instead of taking another channel
+        voices = [channel for channel in self.voices.get(name, []) if channel.get_busy() and channel.get_sound() is sound]
+        if len(voices) >= SOUND_VOICE_LIMIT:
+            channel = voices.pop(0)
+        else:
+            channel = self.free_channel()
+        channel.play(sound)
+        voices.append(channel)
+        self.voices[name] = voices
+
+    def free_channel(self):
+        for channel in self.channels:
+            if not channel.get_busy():
+                return channel
+        # Pool exhausted: steal channels round-robin
+        channel = self.channels[self.next_channel]
+        self.next_channel = (self.next_channel + 1) % len(self.channels)
+        return channel
+
+bank = SoundBank()
+
+def init():
+    return bank.load()
+
+def play(name):
+    bank.play(name)
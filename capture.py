@@ -0,0 +1,114 @@
+import os, time, zlib, queue, struct, threading
+import pygame
+from settings import *
+
+# Gameplay frame capture (--capture / F9).
+#
+# Each finished display frame is blitted into a surface taken from a fixed
+# pool; encoder threads turn pooled frames into a PNG sequence or a raw RGB24
+# video and hand the surface back. PNGs are assembled here around
+# zlib.compress() rather than saved with pygame.image.save(): zlib releases
+# the GIL while it compresses, pygame's encoder holds it for the whole frame
+# and would stall the game loop instead of letting frames drop. If every pooled surface is still waiting
+# to be encoded the frame is dropped and counted - the game loop never waits.
+# PNG files keep the game's frame number, so drops show up as gaps; raw video
+# has no frame numbers, so each dropped frame is written as a copy of the one
+# before it and the video keeps playing in real time.
+#
+# Raw output plays with e.g.:
+#   ffmpeg -f rawvideo -pix_fmt rgb24 -s 1280x720 -r 60 -i capture.rgb out.mp4
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+def png_chunk(tag, data):
+    return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(data, zlib.crc32(tag)))
+
+def encode_png(size, pixels):
+    # 8-bit RGB, every row with filter type 0 (None)
+    width, height = size
+    stride = width * 3
+    rows = memoryview(pixels)
+    scanlines = b''.join([part for y in range(0, height * stride, stride) for part in (b'\0', rows[y:y + stride])])
+    return b''.join((PNG_SIGNATURE,
+                     png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)),
+                     png_chunk(b'IDAT', zlib.compress(scanlines, CAPTURE_PNG_COMPRESSION)),
+                     png_chunk(b'IEND', b'')))
+
+class FrameCapture:
+    def __init__(self, directory, surface, frame_format='png', workers=CAPTURE_WORKERS, pool_size=CAPTURE_POOL_SIZE):
+        self.frame_format = frame_format
+        self.directory = os.path.join(directory, time.strftime('%Y%m%d-%H%M%S'))
+        os.makedirs(self.directory, exist_ok=True)
+        self.size = surface.get_size()
+
+        self.free_frames = queue.SimpleQueue()
+        for _ in range(pool_size):
+            self.free_frames.put(pygame.Surface(self.size, 0, surface))
+        self.pending = queue.Queue() # Never holds more than pool_size frames
+
+        self.frame_number = 0
+        self.captured = 0
+        self.dropped = 0
+
+        self.file = None
+        self.written = 0 # Raw video frames written so far, repeats included
+        self.last_raw = None
+        if frame_format == 'raw':
+            # Raw video has to be written in order, so it gets a single encoder
+            workers = 1
+            self.file = open(os.path.join(self.directory, 'capture.rgb'), 'wb')
+        self.threads = [threading.Thread(target=self.encoder, daemon=True) for _ in range(workers)]
+        for thread in self.threads:
+            thread.start()
+        print(f"Capturing {frame_format} frames to {self.directory}")
+
+    def capture(self, surface):
+        number = self.frame_number
+        self.frame_number += 1
+        try:
+            frame = self.free_frames.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return
+        frame.blit(surface, (0, 0))
+        self.pending.put((number, frame))
+        self.captured += 1
+
+    def encoder(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+            number, frame = item
+            pixels = pygame.image.tobytes(frame, 'RGB')
+            self.free_frames.put(frame)
+            if self.file:
+                self.write_raw(number, pixels)
+            else:
+                with open(os.path.join(self.directory, f'frame_{number:06d}.png'), 'wb') as f:
+                    f.write(encode_png(self.size, pixels))
+
+    def write_raw(self, number, data):
+        self.repeat_last(number)
+        self.file.write(data)
+        self.written += 1
+        self.last_raw = data
+
+    def repeat_last(self, number):
+        # Fill the gap left by dropped frames up to frame `number` with the last frame written
+        while self.written < number:
+            self.file.write(self.last_raw)
+            self.written += 1
+
+    def stop(self):
+        for _ in self.threads:
+            self.pending.put(None)
+        for thread in self.threads:
+            thread.join()
+        if self.file:
+            if self.last_raw:
+                self.repeat_last(self.frame_number) # Frames dropped after the last one written
+            self.file.close()
+            print(f"Capture stopped: {self.written} frames written, {self.dropped} dropped frames repeated ({self.size[0]}x{self.size[1]})")
+        else:
+            print(f"Capture stopped: {self.captured} frames written, {self.dropped} dropped ({self.size[0]}x{self.size[1]})")
@@ -0,0 +1,134 @@
+from settings import *
+
+# Typed collision dispatch.
+#
+# Responses are looked up by sprite_type instead of probing sprites with
+# hasattr() inside the collision loops. Obstacle responses for the player are
+# registered here by level.py; level-side contacts and trigger zones are
+# dispatched by Level itself using a SpatialHash broadphase, and moving
+# entities meet each other through a SweepAndPrune broadphase.
+
+# sprite_type -> response(sprite, direction) when the player walks into it
+push_responses = {}
+# sprite_type -> response(sprite) when the player hits it from below
+head_hit_responses = {}
+# (sprite_type, sprite_type) -> response(a, b) when two moving entities overlap
+pair_responses = {}
+
+class SpatialHash:
+    # Uniform grid of TILE_SIZE cells; each sprite is binned into every cell its rect touches
+    def __init__(self, cell_size=TILE_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.sprite_cells = {} # sprite -> (rect it was binned with, cell keys)
+
+    def cells_for(self, rect):
+        size = self.cell_size
+        return [(x, y)
+                for x in range(rect.left // size, (rect.right - 1) // size + 1)
+                for y in range(rect.top // size, (rect.bottom - 1) // size + 1)]
+
+    def insert(self, sprite):
+        keys = self.cells_for(sprite.rect)
+        self.sprite_cells[sprite] = (sprite.rect.copy(), keys)
+        for key in keys:
+            # Dicts rather than sets keep query results in insertion order
+            self.cells.setdefault(key, {})[sprite] = None
+
+    def remove(self, sprite):
+        entry = self.sprite_cells.pop(sprite, None)
+        if entry:
+            for key in entry[1]:
+                cell = self.cells[key]
+                del cell[sprite]
+                if not cell:
+                    del self.cells[key]
+
+    def update(self, sprite):
+        # Moving sprites are only re-binned when their rect actually changed
+        entry = self.sprite_cells.get(sprite)
+        if entry and entry[0] == sprite.rect:
+            return
+        self.remove(sprite)
+        self.insert(sprite)
+
+    def query(self, rect):
+        found = {}
+        for key in self.cells_for(rect):
+            cell = self.cells.get(key)
+            if cell:
+                found.update(cell)
+        return found
+
+class SweepAndPrune:
+    # Broadphase for sprites that move every frame. The left and right edges of
+    # every rect sit in one list that stays sorted by x between frames. Sprites
+    # only move a few pixels per frame, so re-sorting is an insertion sort with
+    # few swaps, and every swap of a left edge past a right edge is one pair
+    # starting (or stopping) overlapping on x - the pair set is never rebuilt.
+    def __init__(self):
+        self.edges = [] # (sprite, is_right_edge), sorted by x as of the last update
+        # (sprite, sprite) pairs whose x ranges overlap; a dict so pairs resolve in a repeatable order
+        self.x_overlaps = {}
+        # sprite -> insertion number; pairs are ordered by it, never by memory address
+        self.sprites = {}
+        self.added = 0
+
+    def add(self, sprite):
+        # New edges go on the right end; the next update sorts them in and finds their pairs
+        if sprite not in self.sprites:
+            self.sprites[sprite] = self.added
+            self.added += 1
+            self.edges += [(sprite, False), (sprite, True)]
+
+    def remove(self, sprite):
+        if sprite in self.sprites:
+            del self.sprites[sprite]
+            self.edges = [edge for edge in self.edges if edge[0] is not sprite]
+            self.x_overlaps = {pair: None for pair in self.x_overlaps if sprite not in pair}
+
+    def update(self):
+        # Returns the pairs whose rects overlap after this frame's movement
+        edges = self.edges
+        # Right edges sort before left edges at the same x: rects that only touch don't overlap
+        keys = [sprite.rect.right * 2 if is_right else sprite.rect.left * 2 + 1 for sprite, is_right in edges]
+        x_overlaps = self.x_overlaps
+        order = self.sprites
+        for index in range(1, len(edges)):
+            edge = edges[index]
+            key = keys[index]
+            sprite, is_right = edge
+            position = index - 1
+            while position >= 0 and keys[position] > key:
+                other, other_is_right = edges[position]
+                if is_right != other_is_right:
+                    pair = (sprite, other) if order[sprite] < order[other] else (other, sprite)
+                    if is_right:
+                        x_overlaps.pop(pair, None) # Moved left of the other's left edge
+                    else:
+                        x_overlaps[pair] = None # Moved left of the other's right edge
+                edges[position + 1] = edges[position]
+                keys[position + 1] = keys[position]
+                position -= 1
+            edges[position + 1] = edge
+            keys[position + 1] = key
+        return [(a, b) for a, b in x_overlaps if a.rect.top < b.rect.bottom and b.rect.top < a.rect.bottom]
+
+class TriggerTracker:
+    # Turns "which zones overlap this frame" into enter/stay/exit events
+    def __init__(self, handlers):
+        self.handlers = handlers # zone -> (on_enter, on_stay, on_exit), any may be None
+        self.active = set()
+
+    def update(self, zones, *args):
+        # Handlers run in registration order so the outcome doesn't depend on set ordering
+        for zone, (on_enter, on_stay, on_exit) in self.handlers.items():
+            if zone in zones:
+                handler = on_stay if zone in self.active else on_enter
+            elif zone in self.active:
+                handler = on_exit
+            else:
+                continue
+            if handler:
+                handler(*args)
+        self.active = zones
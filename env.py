@@ -0,0 +1,340 @@
+import os, sys, re, random, time, argparse
+from array import array
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import pygame
+import settings
+import player as player_module
+import level as level_module
+from settings import *
+from level import Level, load_map_data
+
+# Headless gym-style wrapper around Level/Player for bots and balance sweeps.
+#
+#   env = GabeEnv()
+#   obs = env.reset(level=1, seed=0)
+#   obs, reward, done = env.step(RIGHT_JUMP)
+#
+# Observations are written into flat buffers so the vectorized wrapper can
+# hand them out straight from shared memory:
+#   tiles    - uint8 (rows, cols) grid of static map chars (0 = empty / padding)
+#   player   - float32 [x, y, dx, dy, health, score, in_water, on_ground]
+#   entities - float32 (MAX_ENTITIES, 3) rows of [type, centerx, centery], type 0 = empty slot
+
+MAX_ENTITIES = 256
+PLAYER_FIELDS = 8
+MAX_STEPS = FPS * 120 # Two minutes of game time
+
+# Rewards
+COIN_REWARD = 1.0
+HURT_PENALTY = -1.0
+WIN_REWARD = 10.0
+DEATH_PENALTY = -10.0
+
+# Map chars that belong to moving/collectable entities rather than the tile grid
+ENTITY_CHARS = 'BCXY1'
+ENTITY_TYPES = {'box': 1, 'coin': 2, 'enemy': 3, 'follower_enemy': 4, 'heart': 5}
+
+NOOP, LEFT, RIGHT, JUMP, LEFT_JUMP, RIGHT_JUMP, RUN_LEFT, RUN_RIGHT, RUN_LEFT_JUMP, RUN_RIGHT_JUMP, UP, DOWN = range(12)
+ACTIONS = [
+    (),
+    (pygame.K_LEFT,),
+    (pygame.K_RIGHT,),
+    (pygame.K_SPACE,),
+    (pygame.K_LEFT, pygame.K_SPACE),
+    (pygame.K_RIGHT, pygame.K_SPACE),
+    (pygame.K_LSHIFT, pygame.K_LEFT),
+    (pygame.K_LSHIFT, pygame.K_RIGHT),
+    (pygame.K_LSHIFT, pygame.K_LEFT, pygame.K_SPACE),
+    (pygame.K_LSHIFT, pygame.K_RIGHT, pygame.K_SPACE),
+    (pygame.K_UP,),
+    (pygame.K_DOWN,),
+]
+
+class VirtualKeys:
+    # Stands in for pygame.key.get_pressed() inside Player.input
+    def __init__(self, pressed=()):
+        self.pressed = set(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+def init_headless():
+    # Levels need a display surface (convert_alpha, CameraGroup) and fonts, but no window
+    if pygame.display.get_surface() is None:
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        pygame.display.init()
+        pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    if not pygame.font.get_init():
+        pygame.font.init()
+
+def apply_settings(overrides):
+    # Balance sweeps: patch constants everywhere `from settings import *` copied them
+    for name, value in overrides.items():
+        if not hasattr(settings, name):
+            raise KeyError(f"Unknown setting {name}")
+        for module in (settings, player_module, level_module, sys.modules[__name__]):
+            if hasattr(module, name):
+                setattr(module, name, value)
+
+def grid_shape_for(map_file, levels):
+    rows, cols = 1, 1
+    for level_number in levels:
+        parsed = load_map_data(map_file, level_number)
+        if parsed:
+            map_data = parsed[1]
+            rows = max(rows, len(map_data))
+            cols = max(cols, max([len(line) for line in map_data] + [1]))
+    return rows, cols
+
+def buffer_size(grid_shape):
+    floats = PLAYER_FIELDS + MAX_ENTITIES * 3
+    return floats * 4 + grid_shape[0] * grid_shape[1]
+
+def buffer_views(buf, grid_shape):
+    # Floats first so they stay 4-byte aligned
+    rows, cols = grid_shape
+    player_end = PLAYER_FIELDS * 4
+    entities_end = player_end + MAX_ENTITIES * 3 * 4
+    view = memoryview(buf)
+    return {
+        'tiles': view[entities_end:entities_end + rows * cols].cast('B', (rows, cols)),
+        'player': view[:player_end].cast('f'),
+        'entities': view[player_end:entities_end].cast('f', (MAX_ENTITIES, 3)),
+    }
+
+class GabeEnv:
+    def __init__(self, map_file='maps.txt', grid_shape=None, buffer=None, max_steps=MAX_STEPS):
+        init_headless()
+        self.map_file = map_file
+        self.max_steps = max_steps
+        self.grid_shape = grid_shape
+        self.buffer = buffer
+        self.views = None
+        self.level = None
+        self.level_number = 1
+        self.seed = None
+        self.frame = 0
+        self.keys = VirtualKeys()
+
+    def ticks(self):
+        # Simulated clock so cooldowns are measured in game frames, not wall time
+        return self.frame * 1000 // FPS
+
+    def reset(self, level=1, seed=None):
+        # The simulation itself is deterministic; the seed is kept for agents that use `random`
+        self.level_number = level
+        self.seed = seed
+        if seed is not None:
+            random.seed(seed)
+        self.frame = 0
+        self.level = Level(self.map_file, level, streaming=False)
+        self.level.player.controls = self.keys
+        self.level.player.get_ticks = self.ticks
+        self.level.start_ticks = 0
+        self.last_score = 0
+        self.last_health = self.level.player.health
+
+        parsed = load_map_data(self.map_file, level)
+        map_data = parsed[1] if parsed else []
+        if self.views is None:
+            if self.grid_shape is None:
+                self.grid_shape = grid_shape_for(self.map_file, [level])
+            if self.buffer is None:
+                self.buffer = bytearray(buffer_size(self.grid_shape))
+            self.views = buffer_views(self.buffer, self.grid_shape)
+            self.entities = self.views['entities'].cast('B').cast('f')
+        self.write_tiles(map_data)
+        self.write_entities()
+        return self.views
+
+    def step(self, action):
+        self.keys.pressed = set(ACTIONS[action] if isinstance(action, int) else action)
+        self.frame += 1
+        self.level.update()
+
+        player = self.level.player
+        reward = (self.level.score - self.last_score) * COIN_REWARD
+        if player.health < self.last_health:
+            reward += (self.last_health - player.health) * HURT_PENALTY
+        self.last_score = self.level.score
+        self.last_health = player.health
+
+        done = False
+        if self.level.level_complete:
+            reward += WIN_REWARD
+            done = True
+        elif self.level.game_over or player.health <= 0:
+            reward += DEATH_PENALTY
+            done = True
+        elif self.frame >= self.max_steps:
+            done = True
+
+        self.write_entities()
+        return self.views, reward, done
+
+    def write_tiles(self, map_data):
+        rows, cols = self.grid_shape
+        tiles = bytearray(rows * cols)
+        for row_index, row in enumerate(map_data[:rows]):
+            for col_index, cell in enumerate(row[:cols]):
+                if cell != ' ' and cell not in ENTITY_CHARS:
+                    tiles[row_index * cols + col_index] = ord(cell)
+        self.views['tiles'].cast('B')[:] = tiles
+
+    def write_entities(self):
+        level = self.level
+        player = level.player
+        self.views['player'][:] = array('f', self.player_state(player))
+
+        entities = self.entities
+        index = 0
+        for group in (level.coin_sprites, level.enemy_sprites, level.item_sprites, level.entity_sprites):
+            for sprite in group:
+                if index >= MAX_ENTITIES:
+                    break
+                if group is level.coin_sprites:
+                    entity_type = ENTITY_TYPES['coin']
+                else:
+                    entity_type = ENTITY_TYPES.get(getattr(sprite, 'sprite_type', None))
+                    # Enemies are entity sprites too; only boxes are left for the last group
+                    if entity_type is None or (group is level.entity_sprites and entity_type != ENTITY_TYPES['box']):
+                        continue
+                entities[index * 3] = entity_type
+                entities[index * 3 + 1] = sprite.rect.centerx
+                entities[index * 3 + 2] = sprite.rect.centery
+                index += 1
+        # Clear slots left over from the previous frame
+        while index < MAX_ENTITIES and entities[index * 3] != 0:
+            entities[index * 3] = 0
+            index += 1
+
+    def player_state(self, player):
+        return [player.rect.centerx, player.rect.centery, player.direction.x, player.direction.y,
+                player.health, self.level.score, float(player.in_water), float(player.on_ground)]
+
+    def render(self):
+        self.level.draw()
+        return pygame.display.get_surface()
+
+    def close(self):
+        if self.views is not None:
+            self.entities.release()
+            for view in self.views.values():
+                view.release()
+        self.views = None
+        self.level = None
+
+def _worker(conn, map_file, grid_shape, shm_name, overrides, max_steps):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    apply_settings(overrides or {})
+    env = GabeEnv(map_file, grid_shape, shm.buf, max_steps)
+    reset_args = (1, None)
+    try:
+        while True:
+            command, data = conn.recv()
+            if command == 'reset':
+                reset_args = data
+                env.reset(*reset_args)
+                conn.send(None)
+            elif command == 'step':
+                _, reward, done = env.step(data)
+                if done:
+                    # Auto-reset so the batch never stalls on a finished episode
+                    env.reset(*reset_args)
+                conn.send((reward, done))
+            elif command == 'close':
+                break
+    finally:
+        env.close()
+        shm.close()
+        conn.close()
+
+class VecGabeEnv:
+    # Runs N GabeEnvs in worker processes; observations live in shared memory,
+    # so only actions, rewards and done flags cross the pipes.
+    def __init__(self, num_envs, map_file='maps.txt', levels=None, settings_overrides=None, max_steps=MAX_STEPS):
+        self.num_envs = num_envs
+        if levels is None:
+            levels = range(1, count_levels(map_file) + 1)
+        self.grid_shape = grid_shape_for(map_file, levels)
+        overrides = settings_overrides or [{}] * num_envs
+        if isinstance(overrides, dict):
+            overrides = [overrides] * num_envs
+
+        ctx = mp.get_context('spawn')
+        self.shms = []
+        self.views = []
+        self.conns = []
+        self.processes = []
+        for i in range(num_envs):
+            shm = shared_memory.SharedMemory(create=True, size=buffer_size(self.grid_shape))
+            parent_conn, child_conn = ctx.Pipe()
+            process = ctx.Process(target=_worker, args=(child_conn, map_file, self.grid_shape, shm.name, overrides[i], max_steps), daemon=True)
+            process.start()
+            child_conn.close()
+            self.shms.append(shm)
+            self.views.append(buffer_views(shm.buf, self.grid_shape))
+            self.conns.append(parent_conn)
+            self.processes.append(process)
+
+    def reset(self, levels=1, seeds=None):
+        if isinstance(levels, int):
+            levels = [levels] * self.num_envs
+        if seeds is None or isinstance(seeds, int):
+            seeds = [seeds if seeds is None else seeds + i for i in range(self.num_envs)]
+        for conn, level_number, seed in zip(self.conns, levels, seeds):
+            conn.send(('reset', (level_number, seed)))
+        for conn in self.conns:
+            conn.recv()
+        return self.views
+
+    def step(self, actions):
+        for conn, action in zip(self.conns, actions):
+            conn.send(('step', action))
+        results = [conn.recv() for conn in self.conns]
+        rewards = [reward for reward, _ in results]
+        dones = [done for _, done in results]
+        return self.views, rewards, dones
+
+    def close(self):
+        for conn in self.conns:
+            try:
+                conn.send(('close', None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+        for views in self.views:
+            for view in views.values():
+                view.release()
+        for shm in self.shms:
+            shm.close()
+            shm.unlink()
+        self.views = []
+        self.shms = []
+
+def count_levels(map_file):
+    with open(map_file, 'r') as f:
+        return len(re.findall(r'level \d+:', f.read().lower()))
+
+def benchmark(num_envs, steps, level_number):
+    vec = VecGabeEnv(num_envs, levels=[level_number])
+    try:
+        vec.reset(level_number, seeds=0)
+        start = time.perf_counter()
+        for _ in range(steps):
+            vec.step([random.randrange(len(ACTIONS)) for _ in range(num_envs)])
+        elapsed = time.perf_counter() - start
+    finally:
+        vec.close()
+    total = steps * num_envs
+    print(f"{num_envs} envs x {steps} steps: {total / elapsed:.0f} env steps/s")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Gabe Adventure headless environment benchmark')
+    parser.add_argument('--envs', type=int, default=os.cpu_count() or 1, help='Number of worker processes')
+    parser.add_argument('--steps', type=int, default=1000, help='Steps per environment')
+    parser.add_argument('--level', type=int, default=1, help='Level to run')
+    args = parser.parse_args()
+    benchmark(args.envs, args.steps, args.level)
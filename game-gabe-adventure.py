@@ -1,10 +1,39 @@
-import argparse
+import startup, time
+import argparse, sys
 from game import Game
+from pacing import PACING_MODES
+from settings import PROFILE_SECONDS
+import_time = time.perf_counter() - startup.process_start
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Gabe Adventure Platformer')
     parser.add_argument('--level', type=int, default=1, help='Starting level number (default: 1)')
+    parser.add_argument('--select', action='store_true', help='Open the level select screen on launch')
+    parser.add_argument('--pipelined', action='store_true', help='Simulate the next frame while the current one is drawn on a render thread')
+    parser.add_argument('--pacing', choices=PACING_MODES, default='sleep', help='Frame pacing: sleep tick, busy-wait tick, vsync, or late-latched input (default: sleep)')
+    parser.add_argument('--pacing-stats', action='store_true', help='Print input latency and a frame time histogram on exit')
+    parser.add_argument('--players', type=int, choices=[1, 2], default=1, help='Local players sharing the level, one split-screen view each (default: 1)')
+    parser.add_argument('--split', choices=['side', 'stacked'], default='side', help='Two-player split: side by side or stacked (default: side)')
+    parser.add_argument('--watch', action='store_true', help='Reload maps.txt edits into the running level')
+    parser.add_argument('--profile-startup', action='store_true', help='Print a breakdown of startup time after the first frame')
+    parser.add_argument('--telemetry', nargs='?', const='telemetry', metavar='DIR', help='Record gameplay telemetry to DIR (default: telemetry)')
+    parser.add_argument('--capture', nargs='?', const='captures', metavar='DIR', help='Record gameplay frames to DIR from the start (F9 toggles; default: captures)')
+    parser.add_argument('--capture-format', choices=['png', 'raw'], default='png', help='PNG sequence or raw RGB24 video (default: png)')
+    parser.add_argument('--profile', nargs='?', type=float, const=PROFILE_SECONDS, metavar='SECONDS', help=f'Profile the first SECONDS of play to profiles/ (F10 starts/stops; default: {PROFILE_SECONDS})')
+    parser.add_argument('--memory-report', action='store_true', help='Print the memory footprint of every level and exit')
+    parser.add_argument('--memory-budget', type=float, metavar='MB', help='Fail the memory report if a level exceeds MB (default: LEVEL_MEMORY_BUDGET_MB)')
     args = parser.parse_args()
 
-    game = Game(start_level=args.level)
+    if args.memory_report:
+        import memory_report
+        sys.exit(memory_report.run(args.memory_budget))
+
+    if args.profile_startup:
+        startup.enabled = True
+        startup.record('import', import_time)
+
+    game = Game(start_level=args.level, watch=args.watch, profile_startup=args.profile_startup, telemetry_dir=args.telemetry,
+                capture_dir=args.capture, capture_format=args.capture_format, select=args.select,
+                pipelined=args.pipelined, pacing=args.pacing, pacing_stats=args.pacing_stats,
+                players=args.players, split=args.split, profile_seconds=args.profile)
     game.run()
@@ -1,19 +1,74 @@
-import pygame, sys
+import pygame, sys, os, time
 from settings import *
-from level import Level
+from level import Level, load_map_data, load_all_map_data
+from assets import get_font
+import audio
+import telemetry
+from capture import FrameCapture
+from profiler import ProfileCapture
+from pipeline import Pipeline
+from pacing import FramePacer
+from thumbnails import ThumbnailCache
+from level_select import LevelSelect
+import startup
+from startup import section
 
 class Game:
-    def __init__(self, start_level=1):
-        pygame.init()
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption('Gabe Adventure')
-        self.clock = pygame.time.Clock()
+    def __init__(self, start_level=1, watch=False, profile_startup=False, telemetry_dir=None, capture_dir=None, capture_format='png', select=False, pipelined=False,
+                 pacing='sleep', pacing_stats=False, players=1, split='side',
+                 profile_seconds=None):
+        with section('init'):
+            # Only the subsystems the game uses; pygame.init() would also open the mixer and joysticks
+            pygame.display.init()
+            pygame.font.init()
+            self.pacer = FramePacer(pacing)
+            self.pacing_stats = pacing_stats
+            self.screen = self.pacer.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption('Gabe Adventure')
+            self.clock = self.pacer.clock
+            self.clock.tick() # Also starts SDL's timer, which pygame.time.get_ticks() relies on
+            self.draw_loading()
+        with section('sound init'):
+            audio.init()
+        if telemetry_dir:
+            telemetry.start(telemetry_dir)
+        
+        # Frame capture (F9 toggles)
+        self.capture_dir = capture_dir or CAPTURE_DIR
+        self.capture_format = capture_format
+        self.capture = None
+        if capture_dir:
+            self.toggle_capture()
+        
+        # On-demand profiler (F10 starts/stops); --profile starts one when the loop starts
+        self.profiler = None
+        self.profile_seconds = profile_seconds or PROFILE_SECONDS
+        self.profile_on_start = bool(profile_seconds)
+        
+        # Render thread drawing frame N while frame N+1 is simulated
+        self.pipeline = Pipeline() if pipelined else None
         
         # Level management
+        self.player_count = players
+        self.split = split
         self.current_level = start_level
         self.max_levels = self.get_max_levels()
-        self.level = Level('maps.txt', self.current_level)
+        self.level = Level('maps.txt', self.current_level, self.player_count, self.split)
         self.game_finished = False
+        self.profile_startup = profile_startup
+        
+        # Map hot-reload
+        self.watch = watch
+        self.last_map_check = 0
+        self.map_mtime = self.get_map_mtime()
+
+        # Level select (Tab); minimaps are shared between openings and queued
+        # for rendering after the first frame, so the menu opens ready
+        self.thumbnails = ThumbnailCache()
+        self.thumbnails_queued = False
+        self.level_select = None
+        if select:
+            self.open_level_select()
 
     def get_max_levels(self):
         try:
@@ -26,34 +81,124 @@ class Game:
         except:
             return 3 # Fallback
 
+    def toggle_capture(self):
+        if self.capture:
+            self.capture.stop()
+            self.capture = None
+        else:
+            self.capture = FrameCapture(self.capture_dir, self.screen, self.capture_format)
+
+    def toggle_profile(self):
+        if self.profiler:
+            self.profiler.stop(self.level)
+            self.profiler = None
+        else:
+            self.profiler = ProfileCapture(PROFILE_DIR, self.level, self.profile_seconds)
+
+    def quit(self):
+        if self.capture:
+            self.capture.stop()
+        if self.profiler:
+            self.toggle_profile()
+        self.thumbnails.shutdown()
+        if self.pipeline:
+            self.pipeline.stop()
+        if self.pacing_stats:
+            self.pacer.report()
+        pygame.quit()
+        sys.exit()
+
+    def get_map_mtime(self):
+        try:
+            return os.stat('maps.txt').st_mtime_ns
+        except OSError:
+            return None
+
+    def check_map_changes(self):
+        # Polling the mtime a few times per second is cheaper than a watcher thread
+        now = pygame.time.get_ticks()
+        if now - self.last_map_check < MAP_WATCH_INTERVAL:
+            return
+        self.last_map_check = now
+        mtime = self.get_map_mtime()
+        if mtime is None or mtime == self.map_mtime:
+            return
+        self.map_mtime = mtime
+        self.max_levels = self.get_max_levels()
+        if self.level_select:
+            # Changed levels hash differently, so only they get new minimaps
+            self.open_level_select(self.level_select.selected_level())
+        else:
+            self.queue_thumbnails()
+        if self.game_finished:
+            return
+
+        start = time.perf_counter()
+        try:
+            parsed = load_map_data('maps.txt', self.current_level)
+        except OSError:
+            return # Editor is probably still writing the file
+        if parsed is None:
+            print(f"Level {self.current_level} missing from maps.txt, keeping the running level")
+            return
+        changes = self.level.apply_map_edit(*parsed)
+        print(f"maps.txt reloaded: {changes} cells changed in {(time.perf_counter() - start) * 1000:.1f} ms")
+
     def reset_level(self):
-        self.level = Level('maps.txt', self.current_level)
+        self.level = Level('maps.txt', self.current_level, self.player_count, self.split)
+
+    def queue_thumbnails(self):
+        # Only levels without a minimap on disk start the worker pool
+        self.thumbnails_queued = True
+        try:
+            levels = load_all_map_data('maps.txt')
+        except OSError:
+            return
+        for _, biome, rows in levels:
+            self.thumbnails.request(biome, rows)
+
+    def open_level_select(self, current_level=None):
+        self.level_select = LevelSelect('maps.txt', self.thumbnails, current_level or self.current_level)
+
+    def start_level(self, level_number):
+        self.current_level = level_number
+        self.level = Level('maps.txt', self.current_level, self.player_count, self.split)
+        self.game_finished = False
+        self.level_select = None
 
     def next_level(self):
         self.current_level += 1
         if self.current_level <= self.max_levels:
-            self.level = Level('maps.txt', self.current_level)
+            self.level = Level('maps.txt', self.current_level, self.player_count, self.split)
         else:
             self.game_finished = True
 
+    def draw_loading(self):
+        # First frame goes up before any level asset is touched; the default font needs no font scan
+        font = pygame.font.Font(None, 36)
+        msg_surf = font.render('Loading...', True, WHITE)
+        self.screen.fill(BG_COLOR)
+        self.screen.blit(msg_surf, msg_surf.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2)))
+        pygame.display.update()
+
     def draw_level_ready(self):
-        font = pygame.font.SysFont('Arial', 24, bold=True)
+        font = get_font(24, bold=True)
         msg_surf = font.render('Press SPACE for Next Level', True, WHITE)
         msg_rect = msg_surf.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 50))
         self.screen.blit(msg_surf, msg_rect)
 
     def draw_restart_msg(self):
-        font = pygame.font.SysFont('Arial', 24, bold=True)
+        font = get_font(24, bold=True)
         msg_surf = font.render('Press R to Restart', True, WHITE)
         msg_rect = msg_surf.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 50))
         self.screen.blit(msg_surf, msg_rect)
 
     def draw_victory(self):
-        font = pygame.font.SysFont('Arial', 48, bold=True)
+        font = get_font(48, bold=True)
         msg_surf = font.render('YOU CONQUERED ALL LEVELS!', True, (255, 215, 0)) # Gold
         msg_rect = msg_surf.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2))
         
-        sub_font = pygame.font.SysFont('Arial', 24)
+        sub_font = get_font(24)
         sub_surf = sub_font.render('Gabe is a hero! Press Esc to Exit', True, WHITE)
         sub_rect = sub_surf.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 60))
         
@@ -62,37 +207,70 @@ class Game:
         self.screen.blit(sub_surf, sub_rect)
 
     def run(self):
+        if self.profile_on_start:
+            self.toggle_profile()
         while True:
+            self.pacer.sample_input()
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+                    self.quit()
+
+                if self.level_select:
+                    if event.type == pygame.KEYDOWN:
+                        if event.key in (pygame.K_TAB, pygame.K_ESCAPE):
+                            self.level_select = None
+                        else:
+                            chosen = self.level_select.handle_key(event.key)
+                            if chosen is not None:
+                                self.start_level(chosen)
+                    continue
                 
                 if self.game_finished:
                     if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                        pygame.quit()
-                        sys.exit()
+                        self.quit()
 
                 if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_F9:
+                        self.toggle_capture()
+                    if event.key == pygame.K_F10:
+                        self.toggle_profile()
+                    if event.key == pygame.K_TAB:
+                        self.open_level_select()
                     if not self.game_finished:
                         if self.level.game_over and event.key == pygame.K_r:
                             self.reset_level()
                         elif self.level.level_complete and event.key == pygame.K_SPACE:
                             self.next_level()
 
+            if self.watch:
+                self.check_map_changes()
+
             self.screen.fill(BG_COLOR)
             
-            if self.game_finished:
+            if self.level_select:
+                self.level_select.draw(self.screen)
+            elif self.game_finished:
                 self.draw_victory()
             else:
-                self.level.run()
-                if self.level.level_complete:
+                shown = self.pipeline.run(self.level) if self.pipeline else self.level.run()
+                if shown.level_complete:
                     self.draw_level_ready()
-                if self.level.game_over:
+                if shown.game_over:
                     self.draw_restart_msg()
 
             pygame.display.update()
-            self.clock.tick(FPS)
+            self.pacer.presented()
+            if self.capture:
+                self.capture.capture(self.screen)
+            if self.profile_startup:
+                self.profile_startup = False
+                startup.report()
+            if not self.thumbnails_queued:
+                self.queue_thumbnails()
+            self.pacer.tick()
+            telemetry.record(telemetry.FRAME, x=self.pacer.work, value=self.clock.get_time())
+            if self.profiler and self.profiler.frame():
+                self.toggle_profile()
 
 if __name__ == '__main__':
     game = Game()
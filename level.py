@@ -1,6 +1,12 @@
-import pygame
+import os, re, pygame
 from settings import *
-from player import Player
+from player import Player, PLAYER_TWO_KEYS
+from assets import load_image, load_processed, get_font, request_background, get_background
+from startup import section
+import audio
+import telemetry
+from collision import SpatialHash, SweepAndPrune, TriggerTracker, push_responses, head_hit_responses, pair_responses
+from particles import ParticleSystem, draw_bursts
 
 class Tile(pygame.sprite.Sprite):
     def __init__(self, pos, groups, sprite_type, biome='grass'):
@@ -20,11 +26,11 @@ class Tile(pygame.sprite.Sprite):
             path = f'{TILE_ASSETS}/terrain_grass_block.png'
         
         try:
-            self.image = pygame.image.load(path).convert_alpha()
+            self.image = load_image(path)
         except:
             # Fallback for biome blocks if specific one not found
             if sprite_type == 'ground':
-                self.image = pygame.image.load(f'{TILE_ASSETS}/terrain_grass_block.png').convert_alpha()
+                self.image = load_image(f'{TILE_ASSETS}/terrain_grass_block.png')
             else:
                 self.image = pygame.Surface((64, 64))
                 self.image.fill(WHITE)
@@ -32,19 +38,20 @@ class Tile(pygame.sprite.Sprite):
         self.rect = self.image.get_rect(topleft=pos)
 
 class Box(pygame.sprite.Sprite):
-    def __init__(self, pos, groups, obstacle_sprites, lava_sprites, water_sprites):
+    def __init__(self, pos, groups, obstacle_sprites, lava_sprites, water_sprites, particles):
         super().__init__(groups)
         self.sprite_type = 'box'
-        self.image = pygame.image.load(f'{TILE_ASSETS}/block_planks.png').convert_alpha()
+        self.image = load_image(f'{TILE_ASSETS}/block_planks.png')
         self.rect = self.image.get_rect(topleft=pos)
         self.obstacle_sprites = obstacle_sprites
         self.lava_sprites = lava_sprites
         self.water_sprites = water_sprites
+        self.particles = particles
         self.direction = pygame.math.Vector2()
         self.gravity = GRAVITY
         self.on_ground = False
         self.in_liquid = False
-        self.player = None # Will be set by Level
+        self.players = [] # Will be set by Level
 
     def push(self, direction):
         # Set horizontal momentum
@@ -70,10 +77,14 @@ class Box(pygame.sprite.Sprite):
         self.direction.y += self.gravity
         self.rect.y += self.direction.y
         
+        was_on_ground = self.on_ground
         self.on_ground = False
         for sprite in self.obstacle_sprites:
             if sprite != self and sprite.rect.colliderect(self.rect):
                 if self.direction.y > 0:
+                    if not was_on_ground and self.direction.y > BOX_DUST_SPEED:
+                        # Landing after a real fall, not settling onto the ground
+                        self.particles.emit('dust', self.rect.midbottom)
                     self.rect.bottom = sprite.rect.top
                     self.direction.y = 0
                     self.on_ground = True
@@ -89,21 +100,22 @@ class Box(pygame.sprite.Sprite):
             else:
                 speed = self.direction.x
 
-            # Check if player is on top before moving
-            player_on_top = False
-            if self.player:
+            # Check which players are on top before moving
+            players = [player for player in self.players if player.alive()]
+            riders = []
+            for player in players:
                 # Tighten overlap check: player's feet should be on box's top
                 # Use hitbox for more precision
-                if self.player.on_ground and abs(self.player.hitbox.bottom - self.rect.top) < 5:
-                    if self.player.hitbox.right > self.rect.left and self.player.hitbox.left < self.rect.right:
-                        player_on_top = True
+                if player.on_ground and abs(player.hitbox.bottom - self.rect.top) < 5:
+                    if player.hitbox.right > self.rect.left and player.hitbox.left < self.rect.right:
+                        riders.append(player)
 
             self.rect.x += speed
             
-            # If player was on top, move them with the box
-            if player_on_top and self.player:
-                self.player.hitbox.x += speed
-                self.player.rect.centerx = self.player.hitbox.centerx
+            # Players on top move with the box
+            for player in riders:
+                player.hitbox.x += speed
+                player.rect.centerx = player.hitbox.centerx
             
             # Check for collisions with obstacles
             for sprite in self.obstacle_sprites:
@@ -121,20 +133,27 @@ class Box(pygame.sprite.Sprite):
                         else:
                             self.direction.x = 0
             
-            # Check if we pushed the player horizontally (if they weren't on top)
-            if self.player and not player_on_top:
-                if self.rect.colliderect(self.player.hitbox):
+            # Check if we pushed a player horizontally (if they weren't on top)
+            for player in players:
+                if player not in riders and self.rect.colliderect(player.hitbox):
                     if speed > 0:
-                        self.player.hitbox.left = self.rect.right
+                        player.hitbox.left = self.rect.right
                     else:
-                        self.player.hitbox.right = self.rect.left
-                    self.player.rect.centerx = self.player.hitbox.centerx
+                        player.hitbox.right = self.rect.left
+                    player.rect.centerx = player.hitbox.centerx
             
             # Friction: If on solid ground, stop immediately after moving
             if self.on_ground:
                 self.direction.x = 0
 
 
+    def get_state(self):
+        return {'pos': self.rect.topleft, 'direction': tuple(self.direction)}
+
+    def set_state(self, state):
+        self.rect.topleft = state['pos']
+        self.direction.update(state['direction'])
+
     def update(self):
         self.apply_gravity()
         self.horizontal_move()
@@ -142,9 +161,10 @@ class Box(pygame.sprite.Sprite):
 class Coin(pygame.sprite.Sprite):
     def __init__(self, pos, groups):
         super().__init__(groups)
+        self.sprite_type = 'coin'
         self.frames = [
-            pygame.image.load(f'{TILE_ASSETS}/coin_gold.png').convert_alpha(),
-            pygame.image.load(f'{TILE_ASSETS}/coin_gold_side.png').convert_alpha()
+            load_image(f'{TILE_ASSETS}/coin_gold.png'),
+            load_image(f'{TILE_ASSETS}/coin_gold_side.png')
         ]
         self.frame_index = 0
         self.animation_speed = 0.05
@@ -164,14 +184,14 @@ class Water(pygame.sprite.Sprite):
     def __init__(self, pos, groups):
         super().__init__(groups)
         self.sprite_type = 'water'
-        self.image = pygame.image.load(f'{TILE_ASSETS}/water_top.png').convert_alpha()
+        self.image = load_image(f'{TILE_ASSETS}/water_top.png')
         self.rect = self.image.get_rect(topleft=pos)
 
 class Lava(pygame.sprite.Sprite):
     def __init__(self, pos, groups):
         super().__init__(groups)
         self.sprite_type = 'lava'
-        self.image = pygame.image.load(f'{TILE_ASSETS}/lava_top.png').convert_alpha()
+        self.image = load_image(f'{TILE_ASSETS}/lava_top.png')
         self.rect = self.image.get_rect(topleft=pos)
 
 class Enemy(pygame.sprite.Sprite):
@@ -181,11 +201,11 @@ class Enemy(pygame.sprite.Sprite):
         
         # Load assets
         self.frames = []
+        self.flipped_frames = []
         raw_files = ['character_beige_walk_a.png', 'character_beige_walk_b.png']
         for filename in raw_files:
-            image = pygame.image.load(f'{PLAYER_ASSETS}/{filename}').convert_alpha()
-            scaled_image = pygame.transform.scale(image, (96, 96))
-            self.frames.append(scaled_image)
+            self.frames.append(load_processed(f'{PLAYER_ASSETS}/{filename}', (96, 96)))
+            self.flipped_frames.append(load_processed(f'{PLAYER_ASSETS}/{filename}', (96, 96), flip=True))
             
         self.frame_index = 0
         self.animation_speed = 0.1
@@ -205,11 +225,10 @@ class Enemy(pygame.sprite.Sprite):
         if self.frame_index >= len(self.frames):
             self.frame_index = 0
             
-        image = self.frames[int(self.frame_index)]
         if self.direction.x > 0:
-            self.image = image
+            self.image = self.frames[int(self.frame_index)]
         else:
-            self.image = pygame.transform.flip(image, True, False)
+            self.image = self.flipped_frames[int(self.frame_index)]
 
     def move(self):
         # Horizontal movement
@@ -239,36 +258,47 @@ class Enemy(pygame.sprite.Sprite):
                     self.rect.top = sprite.rect.bottom
                     self.vertical_direction = 0
 
+    def get_state(self):
+        return {'pos': self.rect.topleft, 'direction': self.direction.x, 'vertical_direction': self.vertical_direction}
+
+    def set_state(self, state):
+        self.rect.topleft = state['pos']
+        self.direction.x = state['direction']
+        self.vertical_direction = state['vertical_direction']
+
     def update(self):
         self.move()
         self.animate()
 
 class FollowerEnemy(Enemy):
-    def __init__(self, pos, groups, obstacle_sprites, player=None):
+    def __init__(self, pos, groups, obstacle_sprites, players=()):
         super().__init__(pos, groups, obstacle_sprites)
         self.sprite_type = 'follower_enemy'
-        self.player = player
+        self.players = players
         
         # Adjust look - maybe different color or scale
         # For now, let's use base Enemy frames but keep them separate
         self.frames = []
+        self.flipped_frames = []
         raw_files = ['character_pink_walk_a.png', 'character_pink_walk_b.png']
         for filename in raw_files:
-            try:
-                image = pygame.image.load(f'{PLAYER_ASSETS}/{filename}').convert_alpha()
-            except:
+            path = f'{PLAYER_ASSETS}/{filename}'
+            if not os.path.exists(path):
                 # Fallback if pink asset doesn't exist
-                image = pygame.image.load(f'{PLAYER_ASSETS}/character_beige_walk_a.png').convert_alpha()
-            scaled_image = pygame.transform.scale(image, (96, 96))
-            self.frames.append(scaled_image)
+                path = f'{PLAYER_ASSETS}/character_beige_walk_a.png'
+            self.frames.append(load_processed(path, (96, 96)))
+            self.flipped_frames.append(load_processed(path, (96, 96), flip=True))
             
         self.speed = 2 # Slightly slower than normal enemy to be fair
         self.follow_distance = 600 # Only follow if within range
 
     def move(self):
-        if self.player:
+        # Follow the nearest player still in the game
+        target = min((player for player in self.players if player.alive()),
+                     key=lambda player: abs(player.rect.centerx - self.rect.centerx), default=None)
+        if target:
             # Simple horizontal follow
-            dist = self.player.rect.centerx - self.rect.centerx
+            dist = target.rect.centerx - self.rect.centerx
             if abs(dist) < self.follow_distance:
                 if dist > 10:
                     self.direction.x = 1
@@ -310,10 +340,10 @@ class Heart(pygame.sprite.Sprite):
         super().__init__(groups)
         self.sprite_type = 'heart'
         try:
-            self.image = pygame.image.load(f'{TILE_ASSETS}/heart.png').convert_alpha()
+            self.image = load_image(f'{TILE_ASSETS}/heart.png')
         except:
             # Fallback to HUD heart if tile asset not found
-            self.image = pygame.image.load(f'{TILE_ASSETS}/hud_heart.png').convert_alpha()
+            self.image = load_image(f'{TILE_ASSETS}/hud_heart.png')
         
         self.rect = self.image.get_rect(center=pos)
         self.direction = pygame.math.Vector2(0, -1)
@@ -322,24 +352,33 @@ class Heart(pygame.sprite.Sprite):
         self.float_range = 10
         self.timer = 0
 
+    def get_state(self):
+        return {'pos': self.rect.topleft, 'spawn_pos_y': self.spawn_pos_y, 'timer': self.timer}
+
+    def set_state(self, state):
+        self.rect.topleft = state['pos']
+        self.spawn_pos_y = state['spawn_pos_y']
+        self.timer = state['timer']
+
     def update(self):
         # Initial pop up
         if self.timer < 10:
             self.rect.y += self.direction.y * self.vel
-            self.timer += 1
         else:
-            # Floating effect
-            self.rect.y = self.spawn_pos_y - 20 + (pygame.time.get_ticks() // 200 % 2) * 2
+            # Floating effect, timed in frames so a replay with the same inputs matches
+            self.rect.y = self.spawn_pos_y - 20 + (self.timer * 1000 // FPS // 200 % 2) * 2
+        self.timer += 1
 
 class LuckyBlock(pygame.sprite.Sprite):
-    def __init__(self, pos, groups, visible_sprites, active_sprites, item_sprites):
+    def __init__(self, pos, groups, visible_sprites, active_sprites, item_sprites, particles):
         super().__init__(groups)
         self.sprite_type = 'lucky_block'
-        self.image = pygame.image.load(f'{TILE_ASSETS}/block_exclamation.png').convert_alpha()
+        self.image = load_image(f'{TILE_ASSETS}/block_exclamation.png')
         self.rect = self.image.get_rect(topleft=pos)
         self.visible_sprites = visible_sprites
         self.active_sprites = active_sprites
         self.item_sprites = item_sprites
+        self.particles = particles
         self.hit_count = 0
         self.original_y = self.rect.y
         self.is_bouncing = False
@@ -348,12 +387,23 @@ class LuckyBlock(pygame.sprite.Sprite):
     def hit(self):
         if self.hit_count == 0:
             self.hit_count += 1
-            self.image = pygame.image.load(f'{TILE_ASSETS}/block_empty.png').convert_alpha()
+            audio.play('bump')
+            telemetry.record(telemetry.LUCKY_HIT, x=self.rect.centerx, y=self.rect.centery)
+            self.image = load_image(f'{TILE_ASSETS}/block_empty.png')
+            self.particles.emit('burst', self.rect.midtop)
             # Spawn heart
             Heart((self.rect.centerx, self.rect.top), [self.visible_sprites, self.active_sprites, self.item_sprites])
             self.is_bouncing = True
             self.bounce_timer = 0
 
+    def get_state(self):
+        return {'hit_count': self.hit_count}
+
+    def set_state(self, state):
+        self.hit_count = state['hit_count']
+        if self.hit_count:
+            self.image = load_image(f'{TILE_ASSETS}/block_empty.png')
+
     def update(self):
         if self.is_bouncing:
             self.bounce_timer += 1
@@ -365,51 +415,226 @@ class LuckyBlock(pygame.sprite.Sprite):
                 self.rect.y = self.original_y
                 self.is_bouncing = False
 
+# Player responses for obstacles that react to being touched
+push_responses['box'] = Box.push
+head_hit_responses['lucky_block'] = LuckyBlock.hit
+
+def overlap(a, b):
+    # How far two overlapping rects reach into each other along x and y
+    return min(a.right, b.right) - max(a.left, b.left), min(a.bottom, b.bottom) - max(a.top, b.top)
+
+def enemies_meet(enemy, other):
+    # Enemies bump and turn around instead of walking through each other
+    depth_x, depth_y = overlap(enemy.rect, other.rect)
+    if depth_y < depth_x:
+        # One fell onto the other and stands on its head
+        upper, lower = sorted((enemy, other), key=lambda sprite: sprite.rect.top)
+        upper.rect.bottom = lower.rect.top
+        upper.vertical_direction = 0
+        return
+    left, right = sorted((enemy, other), key=lambda sprite: sprite.rect.centerx)
+    # Only whoever walked into the other is moved back, onto ground it just left
+    movers = [sprite for sprite, towards in ((left, 1), (right, -1)) if sprite.direction.x == towards]
+    for index, sprite in enumerate(movers):
+        share = depth_x // len(movers) + (depth_x % len(movers) if index == 0 else 0)
+        sprite.rect.x += -share if sprite is left else share
+    left.direction.x = -1
+    right.direction.x = 1
+
+def box_meets_enemy(box, enemy):
+    # Enemies already treat boxes as obstacles; this covers boxes moving into enemies
+    depth_x, depth_y = overlap(box.rect, enemy.rect)
+    if depth_y < depth_x:
+        if box.rect.centery < enemy.rect.centery:
+            # Box dropped onto an enemy: it rides on its head
+            box.rect.bottom = enemy.rect.top
+            box.direction.y = 0
+            box.on_ground = True
+        else:
+            enemy.rect.bottom = box.rect.top
+            enemy.vertical_direction = 0
+        return
+    # Enemies can't walk into boxes, so the box was pushed into the enemy: it is blocked like by a wall
+    away = 1 if enemy.rect.centerx > box.rect.centerx else -1
+    box.rect.x -= depth_x * away
+    box.direction.x = 0
+    enemy.direction.x = away
+
+# Responses for moving entities that overlap each other (either order matches)
+pair_responses['enemy', 'enemy'] = enemies_meet
+pair_responses['enemy', 'follower_enemy'] = enemies_meet
+pair_responses['follower_enemy', 'follower_enemy'] = enemies_meet
+pair_responses['box', 'enemy'] = box_meets_enemy
+pair_responses['box', 'follower_enemy'] = box_meets_enemy
+
 class Ladder(pygame.sprite.Sprite):
     def __init__(self, pos, groups):
         super().__init__(groups)
         self.sprite_type = 'ladder'
-        self.image = pygame.image.load(f'{TILE_ASSETS}/ladder_middle.png').convert_alpha()
+        self.image = load_image(f'{TILE_ASSETS}/ladder_middle.png')
         self.rect = self.image.get_rect(topleft=pos)
 
+def load_map_data(map_file, level_number):
+    # Returns (biome, rows) for one level of the map file, or None if the level is missing
+    with open(map_file, 'r') as f:
+        lines = f.readlines()
+        
+    # Find level section
+    header = f"level {level_number}:"
+    start_index = -1
+    for i, line in enumerate(lines):
+        if header in line.lower():
+            start_index = i + 1
+            break
+    
+    if start_index == -1:
+        return None
+
+    # Find end of level (next level header or EOF)
+    end_index = len(lines)
+    for i in range(start_index, len(lines)):
+        if "level " in lines[i].lower() and ":" in lines[i]:
+            end_index = i
+            break
+
+    # map_data might have empty lines or trailing spaces
+    biome = 'grass'
+    map_data = []
+    for line in lines[start_index:end_index]:
+        line = line.removesuffix('\n')
+        if line.startswith('biome:'):
+            biome = line.split(':')[1].strip()
+            continue
+        map_data.append(line)
+    return biome, map_data
+
+def load_all_map_data(map_file):
+    # Parses every level in one pass: [(level_number, biome, rows)] in file order
+    levels = []
+    with open(map_file, 'r') as f:
+        for line in f:
+            line = line.removesuffix('\n')
+            header = re.search(r'level (\d+):', line.lower())
+            if header:
+                levels.append((int(header.group(1)), 'grass', []))
+            elif levels:
+                number, biome, rows = levels[-1]
+                if line.startswith('biome:'):
+                    levels[-1] = (number, line.split(':')[1].strip(), rows)
+                else:
+                    rows.append(line)
+    return levels
+
+BIOME_BACKGROUNDS = {
+    'forest': 'background_color_trees.png',
+    'desert': 'background_color_desert.png',
+    'stone': 'background_color_hills.png',
+    'mushroom': 'background_color_mushrooms.png',
+    'snow': 'background_clouds.png'
+}
+
+# sprite_type -> trigger zone; zones raise enter/stay/exit events instead of being polled
+TRIGGER_ZONES = {'spikes': 'hazard', 'lava': 'hazard', 'water': 'water', 'ladder': 'ladder', 'exit': 'exit'}
+# Sprite types checked against the player's hitbox rather than its full rect
+HITBOX_COLLISIONS = {'spikes', 'lava', 'water'}
+COLLIDABLE_TYPES = set(TRIGGER_ZONES) | {'coin', 'enemy', 'follower_enemy', 'heart'}
+# Moving entities kept in the sweep-and-prune broadphase: everything with a pair response
+SWEPT_TYPES = {sprite_type for pair in pair_responses for sprite_type in pair}
+
+# Map cells whose sprites move, get collected or change state; they persist across chunk unloads
+ENTITY_CELLS = 'BCXY?'
+
+class ViewSnapshot:
+    # One viewport's part of a frame
+    def __init__(self):
+        self.rect = None # Area of the display this view draws into
+        self.sprites = [] # (image, screen position) in draw order
+        self.particles = [] # (display rect, fblits() sequence) per particle burst, drawn over the sprites
+        self.background_x = 0
+        self.health = 0
+
+class FrameSnapshot:
+    # Everything one frame draws, captured after the update. Nothing in it is
+    # touched by the next update, so it can be drawn on another thread.
+    def __init__(self):
+        self.views = []
+        self.background = None
+        self.score = 0
+        self.level_complete = False
+        self.game_over = False
+
+def split_viewports(count, split='side'):
+    # One full-screen view, or the screen split side by side / stacked
+    screen = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+    if count == 1:
+        return [screen]
+    if split == 'stacked':
+        height = SCREEN_HEIGHT // count
+        return [pygame.Rect(0, index * height, SCREEN_WIDTH, height) for index in range(count)]
+    width = SCREEN_WIDTH // count
+    return [pygame.Rect(index * width, 0, width, SCREEN_HEIGHT) for index in range(count)]
+
 class CameraGroup(pygame.sprite.Group):
+    # Draws the one shared world into any number of viewports
     def __init__(self):
         super().__init__()
-        self.display_surface = pygame.display.get_surface()
-        self.offset = pygame.math.Vector2()
         self.level_width = 0
         self.level_height = 0
 
-    def custom_draw(self, player):
+    def camera_offset(self, player, view_size):
         # Calculate offset based on player position
-        self.offset.x = player.rect.centerx - self.display_surface.get_width() // 2
-        self.offset.y = player.rect.centery - self.display_surface.get_height() // 2
+        view_width, view_height = view_size
+        offset = pygame.math.Vector2(player.rect.centerx - view_width // 2, player.rect.centery - view_height // 2)
 
         # Clamp offsets to prevent seeing the "void"
         # X clamping
-        if self.level_width > self.display_surface.get_width():
-            self.offset.x = max(0, min(self.offset.x, self.level_width - self.display_surface.get_width()))
+        if self.level_width > view_width:
+            offset.x = max(0, min(offset.x, self.level_width - view_width))
         else:
-            self.offset.x = (self.level_width - self.display_surface.get_width()) // 2
+            offset.x = (self.level_width - view_width) // 2
 
         # Y clamping
-        if self.level_height > self.display_surface.get_height():
-            self.offset.y = max(0, min(self.offset.y, self.level_height - self.display_surface.get_height()))
+        if self.level_height > view_height:
+            offset.y = max(0, min(offset.y, self.level_height - view_height))
         else:
-            self.offset.y = (self.level_height - self.display_surface.get_height()) // 2
+            offset.y = (self.level_height - view_height) // 2
+        return offset
 
-        for sprite in self.sprites():
-            offset_pos = sprite.rect.topleft - self.offset
-            self.display_surface.blit(sprite.image, offset_pos)
+    def snapshot(self, player, sprites, viewport, players):
+        # Fills sprites for the view following player; returns the camera offset
+        camera = self.camera_offset(player, viewport.size)
+        offset = camera - viewport.topleft
+        sprites.clear()
+        # Streamed chunks are added after the players, so players are drawn last explicitly
+        sprites.extend([(sprite.image, sprite.rect.topleft - offset) for sprite in self.sprites() if sprite not in players])
+        for other in players:
+            # flicker() changes the alpha of the player's frames in place, so players are copied
+            if other is not player and other.alive() and other.image.get_alpha() != 0:
+                sprites.append((other.image.copy(), other.rect.topleft - offset))
+        # The view's own player goes on top
+        if player.image.get_alpha() != 0:
+            sprites.append((player.image.copy(), player.rect.topleft - offset))
+        return camera
+
+# (character, keymap) for each local player
+PLAYER_SETUPS = [('purple', None), ('green', PLAYER_TWO_KEYS)]
 
 class Level:
-    def __init__(self, map_file, level_number):
+    def __init__(self, map_file, level_number, players=1, split='side', streaming=True):
         # Display surface
         self.display_surface = pygame.display.get_surface()
         self.level_number = level_number
+        # Without streaming every chunk stays loaded and simulated (env.py needs the whole level)
+        self.streaming = streaming
+        # Local co-op: every player shares this world and gets their own viewport
+        self.player_count = players
+        self.viewports = split_viewports(players, split)
+        self.players = []
         
         # Sprite groups
         self.visible_sprites = CameraGroup()
+        self.frame_snapshot = FrameSnapshot()
+        self.particles = ParticleSystem()
         self.active_sprites = pygame.sprite.Group()
         self.obstacle_sprites = pygame.sprite.Group()
         self.coin_sprites = pygame.sprite.Group()
@@ -420,55 +645,66 @@ class Level:
         self.enemy_sprites = pygame.sprite.Group()
         self.item_sprites = pygame.sprite.Group()
         self.ladder_sprites = pygame.sprite.Group()
+        self.entity_sprites = pygame.sprite.Group() # Chunk-persisted entities
+        
+        # Collisions: broadphase grid of everything the player can touch, plus dispatch tables
+        self.collision_grid = SpatialHash()
+        self.entity_sweep = SweepAndPrune() # Moving entities against each other
+        self.contact_handlers = {
+            'coin': self.coin_collision,
+            'enemy': self.enemy_collision,
+            'follower_enemy': self.enemy_collision,
+            'heart': self.item_collision,
+        }
+        self.zone_handlers = {
+            # zone: (on_enter, on_stay, on_exit), each called with the player
+            'hazard': (self.hazard_stay, self.hazard_stay, None),
+            'water': (self.water_enter, None, self.water_exit),
+            'ladder': (self.ladder_stay, self.ladder_stay, self.ladder_exit),
+            'exit': (self.exit_enter, None, None),
+        }
+        self.triggers = [] # One TriggerTracker per player
         
         # Biome & Background
         self.biome = 'grass'
         self.background_image = None
+        self.background_file = None
         
         # UI & State
         self.level_complete = False
         self.game_over = False
         self.score = 0
-        self.font = pygame.font.SysFont('Arial', 32, bold=True)
-        self.coin_gui_image = pygame.image.load(f'{TILE_ASSETS}/hud_coin.png').convert_alpha()
-        self.heart_image = pygame.image.load(f'{TILE_ASSETS}/hud_heart.png').convert_alpha()
-        self.heart_empty_image = pygame.image.load(f'{TILE_ASSETS}/hud_heart_empty.png').convert_alpha()
+        self.start_ticks = pygame.time.get_ticks()
+        telemetry.level_started(level_number)
         
         # Setup level
         self.create_map(map_file)
+
+    # Font and HUD images are loaded on first draw rather than while the level is built
+    @property
+    def font(self):
+        return get_font(32, bold=True)
+
+    @property
+    def coin_gui_image(self):
+        return load_image(f'{TILE_ASSETS}/hud_coin.png')
+
+    @property
+    def heart_image(self):
+        return load_image(f'{TILE_ASSETS}/hud_heart.png')
+
+    @property
+    def heart_empty_image(self):
+        return load_image(f'{TILE_ASSETS}/hud_heart_empty.png')
         
     def create_map(self, map_file):
         try:
-            with open(map_file, 'r') as f:
-                lines = f.readlines()
-                
-            # Find level section
-            header = f"level {self.level_number}:"
-            start_index = -1
-            for i, line in enumerate(lines):
-                if header in line.lower():
-                    start_index = i + 1
-                    break
-            
-            if start_index == -1:
+            with section('map parse'):
+                parsed = load_map_data(map_file, self.level_number)
+            if parsed is None:
                 print(f"Level {self.level_number} not found in {map_file}")
                 return
-
-            # Find end of level (next level header or EOF)
-            end_index = len(lines)
-            for i in range(start_index, len(lines)):
-                if "level " in lines[i].lower() and ":" in lines[i]:
-                    end_index = i
-                    break
-
-            # map_data might have empty lines or trailing spaces
-            map_data = []
-            for line in lines[start_index:end_index]:
-                line = line.removesuffix('\n')
-                if line.startswith('biome:'):
-                    self.biome = line.split(':')[1].strip()
-                    continue
-                map_data.append(line)
+            self.biome, map_data = parsed
             
             # Load background after parsing biome
             self.load_background()
@@ -479,49 +715,16 @@ class Level:
             self.visible_sprites.level_width = self.level_width
             self.visible_sprites.level_height = self.level_height
 
-            for row_index, row in enumerate(map_data):
-                for col_index, cell in enumerate(row):
-                    x = col_index * TILE_SIZE
-                    y = row_index * TILE_SIZE
-                    if cell == '-':
-                        # Match Tile class biome names
-                        tile_biome = self.biome
-                        if tile_biome == 'forest': tile_biome = 'grass'
-                        if tile_biome == 'mushroom': tile_biome = 'purple'
-                        if tile_biome == 'stone': tile_biome = 'stone'
-                        if tile_biome == 'desert': tile_biome = 'sand'
-                        if tile_biome == 'snow': tile_biome = 'snow'
-                        
-                        Tile((x, y), [self.visible_sprites, self.obstacle_sprites], 'ground', tile_biome)
-                    elif cell == 'B':
-                        Box((x, y), [self.visible_sprites, self.active_sprites, self.obstacle_sprites], self.obstacle_sprites, self.lava_sprites, self.water_sprites)
-                    elif cell == 'C':
-                        Coin((x, y), [self.visible_sprites, self.coin_sprites, self.active_sprites])
-                    elif cell == 'S':
-                        Tile((x, y), [self.visible_sprites, self.hazard_sprites], 'spikes', self.biome)
-                    elif cell == 'W':
-                        Water((x, y), [self.visible_sprites, self.water_sprites])
-                    elif cell == 'L':
-                        Lava((x, y), [self.visible_sprites, self.lava_sprites, self.hazard_sprites])
-                    elif cell == '1':
-                        Tile((x, y), [self.visible_sprites], 'start', self.biome)
-                        self.spawn_pos = (x, y)
-                    elif cell == 'E':
-                        Tile((x, y), [self.visible_sprites, self.exit_sprites], 'exit', self.biome)
-                    elif cell == 'X':
-                        Enemy((x, y), [self.visible_sprites, self.enemy_sprites, self.active_sprites], self.obstacle_sprites)
-                    elif cell == 'Y':
-                        FollowerEnemy((x, y), [self.visible_sprites, self.enemy_sprites, self.active_sprites], self.obstacle_sprites)
-                    elif cell == '?':
-                        LuckyBlock((x, y), [self.visible_sprites, self.obstacle_sprites, self.active_sprites], self.visible_sprites, self.active_sprites, self.item_sprites)
-                    elif cell == '#':
-                        Ladder((x, y), [self.visible_sprites, self.ladder_sprites])
+            # Split the map into column chunks; only the ones near the camera become sprites
+            with section('map parse'):
+                self.build_chunks(map_data)
             
             # Place Player at a starting position
             if hasattr(self, 'spawn_pos'):
                 spawn_pos = self.spawn_pos
             else:
                 # Fallback to old logic if '1' not found
+                self.load_chunk(0)
                 spawn_pos = (100, 100)
                 floor_platforms = [s for s in self.obstacle_sprites if s.rect.x < 200]
                 if floor_platforms:
@@ -529,159 +732,455 @@ class Level:
                     spawn_pos = (lowest.rect.x, lowest.rect.y - 100)
 
 
-            self.player = Player(spawn_pos, [self.visible_sprites, self.active_sprites], self.obstacle_sprites)
-        
-            # Pass player reference to follower enemies and boxes
-            for sprite in self.visible_sprites:
-                if hasattr(sprite, 'player'):
-                    sprite.player = self.player
+            with section('sprite construction'):
+                for index in range(self.player_count):
+                    self.players.append(Player(spawn_pos, [self.visible_sprites, self.active_sprites], self.obstacle_sprites,
+                                               *PLAYER_SETUPS[index]))
+                    self.triggers.append(TriggerTracker(self.zone_handlers))
+                self.player = self.players[0]
+
+            with section('sprite construction'):
+                self.stream_chunks()
             
         except FileNotFoundError:
             print(f"File {map_file} not found")
 
-    def load_background(self):
-        biome_bg = {
-            'forest': 'background_color_trees.png',
-            'desert': 'background_color_desert.png',
-            'stone': 'background_color_hills.png',
-            'mushroom': 'background_color_mushrooms.png',
-            'snow': 'background_clouds.png'
-        }
-        bg_file = biome_bg.get(self.biome, 'background_solid_sky.png')
-        try:
-            # Load and scale to screen size using smoothscale to prevent pixelation
-            raw_img = pygame.image.load(f'{BACKGROUND_ASSETS}/{bg_file}').convert()
-            # Scale to screen height, maintain aspect ratio? 
-            # Actually for Kenney gradients, scaling to screen is fine but use smoothscale.
-            self.background_image = pygame.transform.smoothscale(raw_img, (SCREEN_WIDTH, SCREEN_HEIGHT))
-        except:
-            self.background_image = None
-
-    def draw_background(self):
-        if self.background_image:
-            # Simple parallax: background moves slower than the world
-            # Background offset = camera offset * factor
-            parallax_factor = 0.5
-            bg_x = -(self.visible_sprites.offset.x * parallax_factor) % SCREEN_WIDTH
+    def build_chunks(self, map_data):
+        # Each chunk keeps the row slices for its static tiles plus a list of entity
+        # records (cell, pos, state); entity records are rewritten when the chunk unloads
+        self.chunk_count = max(1, -(-self.level_width // (CHUNK_WIDTH * TILE_SIZE)))
+        self.chunk_rows = []
+        self.chunk_entities = []
+        for chunk_index in range(self.chunk_count):
+            first_col = chunk_index * CHUNK_WIDTH
+            rows = [row[first_col:first_col + CHUNK_WIDTH] for row in map_data]
+            entities = []
+            for row_index, row in enumerate(rows):
+                for col_index, cell in enumerate(row):
+                    pos = ((first_col + col_index) * TILE_SIZE, row_index * TILE_SIZE)
+                    if cell in ENTITY_CELLS:
+                        entities.append((cell, pos, None))
+                    elif cell == '1':
+                        self.spawn_pos = pos
+            self.chunk_rows.append(rows)
+            self.chunk_entities.append(entities)
+        self.loaded_chunks = {}
+
+    def spawn_cell(self, cell, pos):
+        x, y = pos
+        if cell == '-':
+            # Match Tile class biome names
+            tile_biome = self.biome
+            if tile_biome == 'forest': tile_biome = 'grass'
+            if tile_biome == 'mushroom': tile_biome = 'purple'
+            if tile_biome == 'stone': tile_biome = 'stone'
+            if tile_biome == 'desert': tile_biome = 'sand'
+            if tile_biome == 'snow': tile_biome = 'snow'
             
-            # Draw two instances for seamless tiling
-            self.display_surface.blit(self.background_image, (bg_x - SCREEN_WIDTH, 0))
-            self.display_surface.blit(self.background_image, (bg_x, 0))
+            return Tile((x, y), [self.visible_sprites, self.obstacle_sprites], 'ground', tile_biome)
+        elif cell == 'B':
+            return Box((x, y), [self.visible_sprites, self.active_sprites, self.obstacle_sprites, self.entity_sprites], self.obstacle_sprites, self.lava_sprites, self.water_sprites, self.particles)
+        elif cell == 'C':
+            return Coin((x, y), [self.visible_sprites, self.coin_sprites, self.active_sprites, self.entity_sprites])
+        elif cell == 'S':
+            return Tile((x, y), [self.visible_sprites, self.hazard_sprites], 'spikes', self.biome)
+        elif cell == 'W':
+            return Water((x, y), [self.visible_sprites, self.water_sprites])
+        elif cell == 'L':
+            return Lava((x, y), [self.visible_sprites, self.lava_sprites, self.hazard_sprites])
+        elif cell == '1':
+            return Tile((x, y), [self.visible_sprites], 'start', self.biome)
+        elif cell == 'E':
+            return Tile((x, y), [self.visible_sprites, self.exit_sprites], 'exit', self.biome)
+        elif cell == 'X':
+            return Enemy((x, y), [self.visible_sprites, self.enemy_sprites, self.active_sprites, self.entity_sprites], self.obstacle_sprites)
+        elif cell == 'Y':
+            return FollowerEnemy((x, y), [self.visible_sprites, self.enemy_sprites, self.active_sprites, self.entity_sprites], self.obstacle_sprites)
+        elif cell == '?':
+            return LuckyBlock((x, y), [self.visible_sprites, self.obstacle_sprites, self.active_sprites, self.entity_sprites], self.visible_sprites, self.active_sprites, self.item_sprites, self.particles)
+        elif cell == '#':
+            return Ladder((x, y), [self.visible_sprites, self.ladder_sprites])
+        elif cell == 'H':
+            # Heart released from a lucky block before its chunk was unloaded
+            return Heart((x, y), [self.visible_sprites, self.active_sprites, self.item_sprites])
+
+    def load_chunk(self, chunk_index):
+        if chunk_index in self.loaded_chunks:
+            return
+        first_x = chunk_index * CHUNK_WIDTH * TILE_SIZE
+        static_sprites = []
+        for row_index, row in enumerate(self.chunk_rows[chunk_index]):
+            for col_index, cell in enumerate(row):
+                if cell != ' ' and cell not in ENTITY_CELLS:
+                    sprite = self.spawn_cell(cell, (first_x + col_index * TILE_SIZE, row_index * TILE_SIZE))
+                    if sprite:
+                        self.track_sprite(sprite)
+                        static_sprites.append(sprite)
+        for cell, pos, state in self.chunk_entities[chunk_index]:
+            self.spawn_entity(cell, pos, state)
+        self.chunk_entities[chunk_index] = []
+        self.loaded_chunks[chunk_index] = static_sprites
+
+    def spawn_entity(self, cell, pos, state=None):
+        sprite = self.spawn_cell(cell, pos)
+        sprite.map_cell, sprite.map_pos = cell, pos
+        if state:
+            sprite.set_state(state)
+        if hasattr(sprite, 'players'):
+            # Shared list, so sprites spawned before the players still see them
+            sprite.players = self.players
+        self.track_sprite(sprite)
+        return sprite
+
+    def track_sprite(self, sprite):
+        if sprite.sprite_type in COLLIDABLE_TYPES:
+            self.collision_grid.update(sprite)
+        if sprite.sprite_type in SWEPT_TYPES:
+            self.entity_sweep.add(sprite)
+
+    def remove_sprite(self, sprite):
+        sprite.kill()
+        self.collision_grid.remove(sprite)
+        self.entity_sweep.remove(sprite)
+
+    def unload_chunk(self, chunk_index):
+        for sprite in self.loaded_chunks.pop(chunk_index):
+            self.remove_sprite(sprite)
+        # Entities are saved into whichever chunk they are standing in now, so boxes
+        # pushed or enemies walking across a border come back where they were left
+        records = self.chunk_entities[chunk_index]
+        for sprite in self.entity_sprites.sprites() + self.item_sprites.sprites():
+            if self.chunk_of(sprite.rect.centerx) == chunk_index:
+                if isinstance(sprite, Heart):
+                    records.append(('H', sprite.rect.center, sprite.get_state()))
+                else:
+                    records.append((sprite.map_cell, sprite.map_pos, sprite.get_state() if hasattr(sprite, 'get_state') else None))
+                self.remove_sprite(sprite)
+
+    def map_rows(self):
+        # Reassemble the file grid (as originally spawned) from the chunk slices
+        return [''.join(rows[row_index] for rows in self.chunk_rows) for row_index in range(len(self.chunk_rows[0]))]
+
+    def apply_map_edit(self, biome, map_data):
+        # Hot-reload: diff the edited grid against the live one and only rebuild the
+        # cells that changed, leaving the player, camera and everything else alone
+        if not hasattr(self, 'chunk_rows'):
+            return 0
+        old_rows = self.map_rows()
+        self.level_height = len(map_data) * TILE_SIZE
+        self.level_width = max([len(line) for line in map_data] + [1]) * TILE_SIZE
+        self.visible_sprites.level_width = self.level_width
+        self.visible_sprites.level_height = self.level_height
+
+        # Chunks are only ever added, so loaded chunk indices stay valid
+        self.chunk_count = max(self.chunk_count, -(-self.level_width // (CHUNK_WIDTH * TILE_SIZE)))
+        while len(self.chunk_rows) < self.chunk_count:
+            self.chunk_rows.append([])
+            self.chunk_entities.append([])
+
+        changes = 0
+        for row_index in range(max(len(old_rows), len(map_data))):
+            old_row = old_rows[row_index] if row_index < len(old_rows) else ''
+            new_row = map_data[row_index] if row_index < len(map_data) else ''
+            if old_row == new_row:
+                continue
+            for col_index in range(max(len(old_row), len(new_row))):
+                old_cell = old_row[col_index] if col_index < len(old_row) else ' '
+                new_cell = new_row[col_index] if col_index < len(new_row) else ' '
+                if old_cell != new_cell:
+                    self.replace_cell((col_index * TILE_SIZE, row_index * TILE_SIZE), old_cell, new_cell)
+                    changes += 1
+
+        for chunk_index in range(self.chunk_count):
+            first_col = chunk_index * CHUNK_WIDTH
+            self.chunk_rows[chunk_index] = [row[first_col:first_col + CHUNK_WIDTH] for row in map_data]
+
+        if biome != self.biome:
+            self.biome = biome
+            self.load_background()
+            # Ground blocks pick their texture from the biome
+            for static_sprites in self.loaded_chunks.values():
+                for i, sprite in enumerate(static_sprites):
+                    if sprite.sprite_type == 'ground':
+                        self.remove_sprite(sprite)
+                        static_sprites[i] = self.spawn_cell('-', sprite.rect.topleft)
+            changes += 1
+        return changes
+
+    def replace_cell(self, pos, old_cell, new_cell):
+        chunk_index = self.chunk_of(pos[0])
+        static_sprites = self.loaded_chunks.get(chunk_index)
+
+        # Remove whatever the old cell spawned (entities may have moved to another chunk)
+        if old_cell in ENTITY_CELLS:
+            for i, records in enumerate(self.chunk_entities):
+                self.chunk_entities[i] = [record for record in records if record[1] != pos]
+            for sprite in self.entity_sprites:
+                if sprite.map_pos == pos:
+                    self.remove_sprite(sprite)
+        elif old_cell != ' ' and static_sprites is not None:
+            for sprite in [s for s in static_sprites if s.rect.topleft == pos]:
+                static_sprites.remove(sprite)
+                self.remove_sprite(sprite)
+
+        if new_cell in ENTITY_CELLS:
+            if static_sprites is not None:
+                self.spawn_entity(new_cell, pos)
+            else:
+                self.chunk_entities[chunk_index].append((new_cell, pos, None))
+        elif new_cell != ' ':
+            if new_cell == '1':
+                self.spawn_pos = pos
+            if static_sprites is not None:
+                sprite = self.spawn_cell(new_cell, pos)
+                if sprite:
+                    self.track_sprite(sprite)
+                    static_sprites.append(sprite)
+
+    def chunk_of(self, x):
+        return max(0, min(int(x) // (CHUNK_WIDTH * TILE_SIZE), self.chunk_count - 1))
+
+    def stream_chunks(self):
+        # Chunks within one chunk of any player's view are loaded, chunks more than two
+        # away from every view are unloaded
+        if self.streaming:
+            wanted = set()
+            kept = set()
+            for player, viewport in zip(self.players, self.viewports):
+                center_x = player.rect.centerx
+                first_view = self.chunk_of(center_x - viewport.width // 2)
+                last_view = self.chunk_of(center_x + viewport.width // 2)
+                wanted.update(range(max(0, first_view - 1), min(self.chunk_count, last_view + 2)))
+                kept.update(range(first_view - 2, last_view + 3))
         else:
-            self.display_surface.fill(BG_COLOR)
-
-    def coin_collision(self):
-        collided_coins = pygame.sprite.spritecollide(self.player, self.coin_sprites, True)
-        if collided_coins:
-            self.score += len(collided_coins)
-
-    def hazard_collision(self):
-        # Use player hitbox for more precise hazard detection (lava, etc.)
-        for sprite in self.hazard_sprites:
-            if sprite.rect.colliderect(self.player.hitbox):
-                self.player.get_damage()
-                break
-            
-    def water_collision(self):
-        # Use player hitbox for water detection
-        self.player.in_water = False
-        for sprite in self.water_sprites:
-            if sprite.rect.colliderect(self.player.hitbox):
-                self.player.in_water = True
-                break
-
-    def enemy_collision(self):
-        if pygame.sprite.spritecollide(self.player, self.enemy_sprites, False):
-            self.player.get_damage()
-
-    def item_collision(self):
-        collided_items = pygame.sprite.spritecollide(self.player, self.item_sprites, True)
-        for item in collided_items:
-            if item.sprite_type == 'heart':
-                self.player.health = min(self.player.health + 1, START_HEALTH)
-
-    def ladder_collision(self):
-        if pygame.sprite.spritecollide(self.player, self.ladder_sprites, False):
-            # Only start climbing if we didn't just jump off a ladder
-            if pygame.time.get_ticks() - self.player.ladder_jump_timer > 200:
-                self.player.climbing = True
+            wanted = kept = set(range(self.chunk_count))
+        for chunk_index in sorted(wanted):
+            self.load_chunk(chunk_index)
+        for chunk_index in list(self.loaded_chunks):
+            if chunk_index not in kept:
+                self.unload_chunk(chunk_index)
+
+        # Only simulate entities whose neighbouring chunks are loaded (or are the level's
+        # edge), so nothing walks or falls off the edge of the streamed-in world
+        loaded = self.loaded_chunks
+        simulated = {chunk_index for chunk_index in loaded
+                     if (chunk_index == 0 or chunk_index - 1 in loaded)
+                     and (chunk_index == self.chunk_count - 1 or chunk_index + 1 in loaded)}
+        for sprite in self.entity_sprites.sprites() + self.item_sprites.sprites():
+            if self.chunk_of(sprite.rect.centerx) in simulated:
+                self.active_sprites.add(sprite)
             else:
-                self.player.climbing = False
+                self.active_sprites.remove(sprite)
+
+    def load_background(self):
+        self.background_file = BIOME_BACKGROUNDS.get(self.biome, 'background_solid_sky.png')
+        # Decoded in the background; snapshot() picks it up once it's ready
+        self.background_image = get_background(self.background_file)
+        request_background(self.background_file)
+
+    def draw_background(self, snapshot, view):
+        if snapshot.background:
+            # Draw two instances for seamless tiling
+            bg_x = view.rect.x + view.background_x
+            self.display_surface.blit(snapshot.background, (bg_x - SCREEN_WIDTH, view.rect.y))
+            self.display_surface.blit(snapshot.background, (bg_x, view.rect.y))
         else:
-            self.player.climbing = False
+            self.display_surface.fill(BG_COLOR, view.rect)
+
+    def resolve_collisions(self, player, triggers):
+        # One broadphase query around the player, then dispatch on sprite_type
+        zones = set()
+        contacts = []
+        for sprite in self.collision_grid.query(player.rect):
+            sprite_type = sprite.sprite_type
+            # Liquids and spikes use the tighter hitbox, everything else the sprite rect
+            player_rect = player.hitbox if sprite_type in HITBOX_COLLISIONS else player.rect
+            if sprite.rect.colliderect(player_rect):
+                zone = TRIGGER_ZONES.get(sprite_type)
+                if zone:
+                    zones.add(zone)
+                else:
+                    contacts.append(sprite)
+        triggers.update(zones, player)
+        for sprite in contacts:
+            self.contact_handlers[sprite.sprite_type](sprite, player)
+
+    def resolve_entity_contacts(self):
+        # Moving entities that ran into each other this frame, dispatched on both sprite types
+        for a, b in self.entity_sweep.update():
+            if a not in self.active_sprites and b not in self.active_sprites:
+                continue # Both frozen outside the simulated chunks
+            response = pair_responses.get((a.sprite_type, b.sprite_type))
+            if response:
+                response(a, b)
+            elif (b.sprite_type, a.sprite_type) in pair_responses:
+                pair_responses[b.sprite_type, a.sprite_type](b, a)
 
-    def check_win(self):
-        if pygame.sprite.spritecollide(self.player, self.exit_sprites, False):
-            self.level_complete = True
+    # Contact responses
+    def coin_collision(self, coin, player):
+        self.remove_sprite(coin)
+        self.score += 1
+        self.particles.emit('sparkle', coin.rect.center)
+        audio.play('coin')
+        telemetry.record(telemetry.COIN, x=player.rect.centerx, y=player.rect.centery, value=1)
 
-    def draw_ui(self):
+    def enemy_collision(self, enemy, player):
+        if player.get_damage():
+            player.damage_cause = 'enemy'
+
+    def item_collision(self, item, player):
+        self.remove_sprite(item)
+        player.health = min(player.health + 1, START_HEALTH)
+        audio.play('magic')
+
+    # Trigger zone events
+    def hazard_stay(self, player):
+        if player.get_damage():
+            player.damage_cause = 'hazard'
+
+    def water_enter(self, player):
+        player.in_water = True
+        self.particles.emit('splash', player.hitbox.midbottom)
+
+    def water_exit(self, player):
+        player.in_water = False
+        self.particles.emit('splash', player.hitbox.midbottom)
+
+    def ladder_stay(self, player):
+        # Only start climbing if we didn't just jump off a ladder
+        player.climbing = player.get_ticks() - player.ladder_jump_timer > 200
+
+    def ladder_exit(self, player):
+        player.climbing = False
+
+    def exit_enter(self, player):
+        self.level_complete = True
+        audio.play('gem')
+        telemetry.record(telemetry.LEVEL_COMPLETE, value=(player.get_ticks() - self.start_ticks) / 1000)
+
+    def draw_ui(self, snapshot, view):
+        x, y = view.rect.topleft
         # Draw coin image
-        self.display_surface.blit(self.coin_gui_image, (20, 20))
+        self.display_surface.blit(self.coin_gui_image, (x + 20, y + 20))
         # Draw score text
-        score_surf = self.font.render(f'x {self.score}', True, (0, 0, 0))
-        self.display_surface.blit(score_surf, (80, 25))
+        score_surf = self.font.render(f'x {snapshot.score}', True, (0, 0, 0))
+        self.display_surface.blit(score_surf, (x + 80, y + 25))
         
         # Draw hearts
         for i in range(START_HEALTH):
-            x = 20 + i * 50
-            if i < self.player.health:
-                self.display_surface.blit(self.heart_image, (x, 70))
+            if i < view.health:
+                self.display_surface.blit(self.heart_image, (x + 20 + i * 50, y + 70))
             else:
-                self.display_surface.blit(self.heart_empty_image, (x, 70))
-        
-        # Draw Win Message
-        if self.level_complete:
-            win_surf = self.font.render('LEVEL COMPLETE!', True, (255, 255, 255))
-            win_rect = win_surf.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2))
-            # Draw overlay
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-            overlay.set_alpha(128)
-            overlay.fill((0, 0, 0))
-            self.display_surface.blit(overlay, (0,0))
-            self.display_surface.blit(win_surf, win_rect)
+                self.display_surface.blit(self.heart_empty_image, (x + 20 + i * 50, y + 70))
+
+    def draw_win(self):
+        win_surf = self.font.render('LEVEL COMPLETE!', True, (255, 255, 255))
+        win_rect = win_surf.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2))
+        # Draw overlay
+        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        overlay.set_alpha(128)
+        overlay.fill((0, 0, 0))
+        self.display_surface.blit(overlay, (0,0))
+        self.display_surface.blit(win_surf, win_rect)
 
     def boundary_check(self):
-        # Keep player within level width
-        if self.player.rect.left < 0:
-            self.player.rect.left = 0
-        if self.player.rect.right > self.level_width:
-            self.player.rect.right = self.level_width
+        for player in self.players:
+            if not player.alive():
+                continue
+            # Keep player within level width
+            if player.rect.left < 0:
+                player.rect.left = 0
+            if player.rect.right > self.level_width:
+                player.rect.right = self.level_width
+                
+            # If player falls below the level, he is hurt or dies
+            # For now, let's keep him from falling into the "void" at the bottom
+            # if the user doesn't want void, we might block him or kill him
+            if player.rect.top > self.level_height:
+                player.health = 0
+                player.damage_cause = 'fall'
             
-        # If player falls below the level, he is hurt or dies
-        # For now, let's keep him from falling into the "void" at the bottom
-        # if the user doesn't want void, we might block him or kill him
-        if self.player.rect.top > self.level_height:
-            self.player.health = 0
-            self.game_over = True
-        
-        if self.player.health <= 0:
-            self.game_over = True
+            if player.health <= 0 and not self.game_over:
+                telemetry.record(telemetry.DEATH, telemetry.CAUSES.get(player.damage_cause, 0), player.rect.centerx, player.rect.centery)
+                if any(other.health > 0 for other in self.players):
+                    # Co-op: the others play on, this player leaves the world
+                    player.kill()
+                else:
+                    self.game_over = True
 
-    def run(self):
+    def update(self):
         # Run the level logic
-        if not self.level_complete and self.player.health > 0:
-            self.ladder_collision()
+        if not self.level_complete and any(player.health > 0 for player in self.players):
             self.active_sprites.update()
-            self.coin_collision()
-            self.hazard_collision()
-            self.water_collision()
-            self.enemy_collision()
-            self.item_collision()
+            self.resolve_entity_contacts()
+            # Enemies and hearts move, so they are re-binned before the players query the grid
+            for sprite in self.enemy_sprites:
+                self.collision_grid.update(sprite)
+            for sprite in self.item_sprites:
+                self.collision_grid.update(sprite)
+            for player, triggers in zip(self.players, self.triggers):
+                if player.alive():
+                    self.resolve_collisions(player, triggers)
             self.boundary_check()
-            self.check_win()
-            
-        self.draw_background()
-        self.visible_sprites.custom_draw(self.player)
-        self.draw_ui()
+            self.stream_chunks()
+        # Effects keep playing out over the level complete / game over screens
+        self.particles.update()
+
+    def snapshot(self, snapshot):
+        # Fills snapshot with the state the next draw needs and returns it
+        if len(snapshot.views) != len(self.viewports):
+            snapshot.views = [ViewSnapshot() for _ in self.viewports]
+        for view, player, viewport in zip(snapshot.views, self.players, self.viewports):
+            camera = self.visible_sprites.snapshot(player, view.sprites, viewport, self.players)
+            view.particles = self.particles.view_bursts(camera - viewport.topleft, viewport)
+            view.rect = viewport
+            # Simple parallax: background moves at half the camera speed
+            view.background_x = -(camera.x * 0.5) % SCREEN_WIDTH
+            view.health = player.health
+        if self.background_image is None and self.background_file:
+            self.background_image = get_background(self.background_file)
+        snapshot.background = self.background_image
+        snapshot.score = self.score
+        snapshot.level_complete = self.level_complete
+        snapshot.game_over = self.game_over
+        return snapshot
+
+    def draw_snapshot(self, snapshot):
+        # Every view draws the same world; clipping keeps each one inside its own rect
+        for view in snapshot.views:
+            self.display_surface.set_clip(view.rect)
+            self.draw_background(snapshot, view)
+            self.display_surface.fblits(view.sprites)
+            draw_bursts(self.display_surface, view.particles)
+            self.draw_ui(snapshot, view)
+        self.display_surface.set_clip(None)
+        for view in snapshot.views[1:]:
+            # Divider along the shared edge
+            if view.rect.x:
+                pygame.draw.line(self.display_surface, (0, 0, 0), view.rect.topleft, view.rect.bottomleft, 4)
+            else:
+                pygame.draw.line(self.display_surface, (0, 0, 0), view.rect.topleft, view.rect.topright, 4)
         
-        if self.player.health <= 0:
-            self.draw_game_over()
+        if snapshot.level_complete:
+            self.draw_win()
+        for view in snapshot.views:
+            if view.health <= 0:
+                self.draw_game_over(view.rect)
 
-    def draw_game_over(self):
+    def draw(self):
+        snapshot = self.snapshot(self.frame_snapshot)
+        self.draw_snapshot(snapshot)
+        return snapshot
+
+    def run(self):
+        self.update()
+        return self.draw()
+
+    def draw_game_over(self, rect):
         death_surf = self.font.render('GAME OVER', True, (255, 0, 0))
-        death_rect = death_surf.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2))
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        death_rect = death_surf.get_rect(center=rect.center)
+        overlay = pygame.Surface(rect.size)
         overlay.set_alpha(128)
         overlay.fill((0, 0, 0))
-        self.display_surface.blit(overlay, (0,0))
+        self.display_surface.blit(overlay, rect.topleft)
         self.display_surface.blit(death_surf, death_rect)
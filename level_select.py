@@ -0,0 +1,77 @@
+import pygame
+from settings import *
+from level import load_all_map_data
+from assets import get_font
+
+class LevelSelect:
+    # Grid of minimap cards; only the rows on screen are loaded and drawn
+    def __init__(self, map_file, thumbnails, current_level=1):
+        self.thumbnails = thumbnails
+        self.levels = load_all_map_data(map_file)
+        self.paths = [thumbnails.request(biome, rows) for _, biome, rows in self.levels]
+        numbers = [number for number, _, _ in self.levels]
+        self.selected = numbers.index(current_level) if current_level in numbers else 0
+        self.first_row = 0
+
+        width, height = THUMBNAIL_SIZE
+        self.gap = (SCREEN_WIDTH - THUMBNAIL_COLUMNS * width) // (THUMBNAIL_COLUMNS + 1)
+        self.card_height = height + 36
+        self.top = 100
+        self.visible_rows = max(1, (SCREEN_HEIGHT - self.top - 50) // (self.card_height + self.gap))
+
+    def selected_level(self):
+        return self.levels[self.selected][0] if self.levels else None
+
+    def handle_key(self, key):
+        # Returns the level number to start, or None
+        if not self.levels:
+            return None
+        if key in (pygame.K_RETURN, pygame.K_SPACE):
+            return self.selected_level()
+        moves = {pygame.K_LEFT: -1, pygame.K_RIGHT: 1, pygame.K_UP: -THUMBNAIL_COLUMNS, pygame.K_DOWN: THUMBNAIL_COLUMNS}
+        if key in moves:
+            self.selected = min(max(self.selected + moves[key], 0), len(self.levels) - 1)
+            # Scroll so the selected row stays on screen
+            row = self.selected // THUMBNAIL_COLUMNS
+            if row < self.first_row:
+                self.first_row = row
+            elif row >= self.first_row + self.visible_rows:
+                self.first_row = row - self.visible_rows + 1
+        return None
+
+    def draw(self, screen):
+        screen.fill((20, 20, 40))
+        title = get_font(48, bold=True).render('Select Level', True, WHITE)
+        screen.blit(title, title.get_rect(midtop=(SCREEN_WIDTH // 2, 24)))
+
+        font = get_font(20)
+        width, height = THUMBNAIL_SIZE
+        start = self.first_row * THUMBNAIL_COLUMNS
+        end = min(len(self.levels), start + self.visible_rows * THUMBNAIL_COLUMNS)
+        for index in range(start, end):
+            column = index % THUMBNAIL_COLUMNS
+            row = index // THUMBNAIL_COLUMNS - self.first_row
+            x = self.gap + column * (width + self.gap)
+            y = self.top + row * (self.card_height + self.gap)
+            thumb_rect = pygame.Rect(x, y, width, height)
+
+            thumbnail = self.thumbnails.get(self.paths[index])
+            if thumbnail:
+                screen.blit(thumbnail, thumb_rect)
+            else:
+                pygame.draw.rect(screen, (40, 40, 70), thumb_rect)
+                wait_surf = font.render('Rendering...', True, (150, 150, 180))
+                screen.blit(wait_surf, wait_surf.get_rect(center=thumb_rect.center))
+
+            number, biome, _ = self.levels[index]
+            label = font.render(f'Level {number} - {biome.capitalize()}', True, WHITE)
+            screen.blit(label, (x, y + height + 8))
+            if index == self.selected:
+                pygame.draw.rect(screen, (255, 215, 0), thumb_rect.inflate(8, 8), 4)
+
+        pending = sum(1 for path in self.paths if not self.thumbnails.ready(path))
+        hint = 'Arrows: Choose   Enter: Play   Tab: Back'
+        if pending:
+            hint += f'   (rendering {pending} minimaps)'
+        hint_surf = font.render(hint, True, (180, 180, 200))
+        screen.blit(hint_surf, hint_surf.get_rect(midbottom=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 16)))
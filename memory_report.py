@@ -0,0 +1,132 @@
+import gc, os, sys, tracemalloc
+import pygame
+import assets
+from settings import *
+from env import init_headless, count_levels
+from level import Level
+
+# Per-level memory footprint (--memory-report).
+#
+# Each level is built with empty asset caches and the camera is swept across
+# it chunk by chunk; the report shows the peak resident position. Pixel data
+# lives in SDL allocations tracemalloc can't see, so the total is surface bytes
+# plus the Python heap traced while the level was alive.
+
+MB = 1024 * 1024
+
+def surface_bytes(surface):
+    return surface.get_pitch() * surface.get_height()
+
+def sprite_surfaces(sprite):
+    surfaces = [sprite.image]
+    surfaces += getattr(sprite, 'frames', []) + getattr(sprite, 'flipped_frames', [])
+    for frames in list(getattr(sprite, 'animations', {}).values()) + list(getattr(sprite, 'flipped_animations', {}).values()):
+        surfaces += frames
+    return surfaces
+
+def object_bytes(sprite):
+    # Shallow size of the sprite plus the small objects it owns (rects, vectors, frame lists)
+    size = sys.getsizeof(sprite) + sys.getsizeof(sprite.__dict__)
+    for value in sprite.__dict__.values():
+        if isinstance(value, (pygame.Rect, pygame.math.Vector2, list, dict, tuple)):
+            size += sys.getsizeof(value)
+    return size
+
+def processed_name(path, size, flip):
+    return f"{os.path.basename(path)} {size[0]}x{size[1]}{' flipped' if flip else ''}"
+
+def level_groups(level):
+    return [value for value in vars(level).values() if isinstance(value, pygame.sprite.AbstractGroup)]
+
+def measure(level):
+    asset_names = {id(surface): os.path.basename(path) for path, surface in assets.image_cache.items()}
+    asset_names.update({id(surface): os.path.basename(path) for path, surface in assets.background_cache.items() if surface})
+    # Scaled and flipped images by source and size; players draw their own copies of them
+    asset_names.update({id(surface): processed_name(path, size, flip) for (path, size, flip, _, _), surface in assets.processed_cache.items()})
+    for sprite in level.visible_sprites:
+        for frame_id, source in getattr(sprite, 'frame_sources', {}).items():
+            asset_names[frame_id] = f'{processed_name(*source)} (player copy)'
+
+    surfaces = {}
+    seen = set()
+    def add_surface(surface, owner):
+        if surface is None or id(surface) in seen:
+            return
+        seen.add(id(surface))
+        name = asset_names.get(id(surface), f'{owner} (generated)')
+        surfaces[name] = surfaces.get(name, 0) + surface_bytes(surface)
+
+    classes = {}
+    for sprite in level.visible_sprites:
+        for surface in sprite_surfaces(sprite):
+            add_surface(surface, type(sprite).__name__)
+        count, size = classes.get(type(sprite).__name__, (0, 0))
+        classes[type(sprite).__name__] = (count + 1, size + object_bytes(sprite))
+    add_surface(level.background_image, 'background')
+    for surface in list(assets.image_cache.values()) + list(assets.processed_cache.values()):
+        add_surface(surface, 'cached') # HUD images and anything else the level touched
+
+    # Every group keeps a sprite dict, and every sprite a dict of its groups
+    groups = level_groups(level)
+    bookkeeping = sum(sys.getsizeof(group.spritedict) for group in groups)
+    bookkeeping += sum(sys.getsizeof(sprite.groups()) for sprite in level.visible_sprites)
+    return surfaces, classes, bookkeeping
+
+def report_level(level_number, map_file='maps.txt'):
+    assets.image_cache.clear()
+    assets.background_cache.clear()
+    assets.processed_cache.clear()
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    level = Level(map_file, level_number)
+    if not hasattr(level, 'player'):
+        tracemalloc.stop()
+        return None
+    # Decode the background synchronously so it's part of the measurement
+    assets.decode_background(level.background_file)
+    level.background_image = assets.get_background(level.background_file)
+
+    peak = None
+    chunk_pixels = CHUNK_WIDTH * TILE_SIZE
+    for chunk_index in range(level.chunk_count):
+        level.player.rect.centerx = chunk_index * chunk_pixels + chunk_pixels // 2
+        level.stream_chunks()
+        gc.collect()
+        heap = tracemalloc.get_traced_memory()[0] - baseline
+        surfaces, classes, bookkeeping = measure(level)
+        total = heap + sum(surfaces.values())
+        if peak is None or total > peak[0]:
+            peak = (total, chunk_index, heap, surfaces, classes, bookkeeping)
+    tracemalloc.stop()
+
+    total, chunk_index, heap, surfaces, classes, bookkeeping = peak
+    width = max([34] + [len(name) + 2 for name in surfaces]) # Asset names set the column width
+    print(f"Level {level_number} ({level.biome}, {level.level_width // TILE_SIZE}x{level.level_height // TILE_SIZE} tiles, "
+          f"{level.chunk_count} chunks): {total / MB:.2f} MB at peak (camera on chunk {chunk_index})")
+    print(f"  {'Surfaces':<{width + 2}}{sum(surfaces.values()) / MB:8.2f} MB")
+    for name, size in sorted(surfaces.items(), key=lambda item: -item[1]):
+        print(f"    {name:<{width}}{size / 1024:8.1f} KB")
+    print(f"  {'Python heap (tracemalloc)':<{width + 2}}{heap / MB:8.2f} MB")
+    print("    Sprite objects by class")
+    for name, (count, size) in sorted(classes.items(), key=lambda item: -item[1][1]):
+        print(f"      {name:<20}x{count:<{width - 23}}{size / 1024:8.1f} KB")
+    print(f"    {'Group bookkeeping':<{width}}{bookkeeping / 1024:8.1f} KB")
+    return total
+
+def run(budget_mb=None, map_file='maps.txt'):
+    init_headless()
+    budget = (budget_mb if budget_mb is not None else LEVEL_MEMORY_BUDGET_MB) * MB
+    over_budget = []
+    for level_number in range(1, count_levels(map_file) + 1):
+        total = report_level(level_number, map_file)
+        if total is not None and total > budget:
+            over_budget.append((level_number, total))
+        print()
+    if over_budget:
+        for level_number, total in over_budget:
+            print(f"Level {level_number} uses {total / MB:.2f} MB, over the {budget / MB:.0f} MB budget")
+        return 1
+    print(f"All levels within the {budget / MB:.0f} MB budget")
+    return 0
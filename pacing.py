@@ -0,0 +1,184 @@
+import os, time, random, argparse
+import pygame
+from settings import *
+
+# Frame pacing (--pacing).
+#
+#   sleep  clock.tick(FPS) sleeps after each present (the original loop)
+#   busy   clock.tick_busy_loop(FPS) spins instead, trading a core for steadier frames
+#   vsync  display.update() waits for the vertical blank
+#   late   sleeps *before* pumping input, so keys are read just early enough
+#          for update + draw to finish by the next present (vsync if available)
+#
+# Every mode measures the same two things. Input latency runs from the moment
+# keys were sampled to the moment the frame was presented. A key press that
+# lands between two samples also waits for the next one, so the expected
+# press-to-present time adds half a sample interval on top. Frame time is the
+# time between presents; its spread is the jitter shown in the histogram.
+
+PACING_MODES = ('sleep', 'busy', 'vsync', 'late')
+
+# Frame times are counted in fixed 0.1 ms buckets up to this, so stats stay the same size all session
+HISTOGRAM_MS = 100
+HISTOGRAM_STEP = 0.1
+
+def sleep_until(deadline):
+    # time.sleep() for the bulk of the wait, then spin through the last millisecond
+    remaining = deadline - time.perf_counter()
+    if remaining > 0.002:
+        time.sleep(remaining - 0.001)
+    while time.perf_counter() < deadline:
+        pass
+
+class FramePacer:
+    def __init__(self, mode='sleep', fps=FPS):
+        self.mode = mode
+        self.fps = fps
+        self.period = 1 / fps
+        self.clock = pygame.time.Clock()
+        self.vsync = False # Set once set_mode() actually granted vsync
+
+        now = time.perf_counter()
+        self.sample_time = now
+        self.last_present = None
+        self.next_present = now + self.period
+        self.work_estimate = 0.0 # Input sample to present, seconds; jumps up fast, decays slowly
+
+        self.work = 0.0 # ms from the last input sample to its present
+
+        # Running totals rather than per-frame lists, so a long session doesn't grow
+        self.frames = 0
+        self.frame_sum = 0.0 # ms between presents
+        self.frame_square_sum = 0.0
+        self.frame_buckets = [0] * (round(HISTOGRAM_MS / HISTOGRAM_STEP) + 1)
+        self.latency_sum = 0.0 # ms from input sample to present
+        self.samples = 0
+        self.interval_sum = 0.0 # ms between input samples
+        self.last_interval = None
+        self.worst = 0.0 # longest sample interval + latency, i.e. worst press-to-present
+
+    def set_mode(self, size):
+        # Opens the window with vsync for the modes that use it, falling back to a plain window
+        # The dummy driver accepts vsync=1 but has no display to wait for
+        if self.mode in ('vsync', 'late') and pygame.display.get_driver() != 'dummy':
+            try:
+                surface = pygame.display.set_mode(size, pygame.SCALED, vsync=1)
+                self.vsync = True
+                return surface
+            except pygame.error:
+                print(f"vsync unavailable, '{self.mode}' pacing falls back to a timed {self.fps} FPS cap")
+        return pygame.display.set_mode(size)
+
+    def sample_input(self):
+        # Call right before the event pump: everything after it is input latency
+        if self.mode == 'late':
+            sleep_until(self.next_present - self.work_estimate - LATE_LATCH_MARGIN)
+        now = time.perf_counter()
+        self.last_interval = (now - self.sample_time) * 1000
+        self.interval_sum += self.last_interval
+        self.sample_time = now
+
+    def presented(self):
+        # Call right after display.update()
+        now = time.perf_counter()
+        work = now - self.sample_time
+        self.work_estimate = max(work, self.work_estimate * 0.95)
+        self.work = work * 1000
+        if self.samples:
+            # The first interval runs from construction, not from a previous sample
+            self.worst = max(self.worst, self.work + self.last_interval)
+        self.samples += 1
+        self.latency_sum += self.work
+        if self.last_present is not None:
+            frame_time = (now - self.last_present) * 1000
+            self.frames += 1
+            self.frame_sum += frame_time
+            self.frame_square_sum += frame_time * frame_time
+            self.frame_buckets[min(int(frame_time / HISTOGRAM_STEP), len(self.frame_buckets) - 1)] += 1
+        self.last_present = now
+
+        if self.vsync:
+            # Presents are locked to the display; the next one is a refresh after this one
+            self.next_present = now + self.period
+        else:
+            self.next_present = max(self.next_present + self.period, now)
+
+    def tick(self):
+        if self.mode == 'busy':
+            self.clock.tick_busy_loop(self.fps)
+        elif self.vsync or self.mode == 'late':
+            # Already waited for the display (vsync) or before sampling input (late)
+            self.clock.tick()
+        else:
+            self.clock.tick(self.fps)
+
+    def percentile(self, fraction):
+        # Upper edge of the bucket holding that fraction of frames (the last bucket is open-ended)
+        wanted = min(self.frames - 1, int(self.frames * fraction)) + 1
+        seen = 0
+        for index, count in enumerate(self.frame_buckets):
+            seen += count
+            if seen >= wanted:
+                return (index + 1) * HISTOGRAM_STEP
+        return HISTOGRAM_MS
+
+    def report(self):
+        frames = self.frames
+        if not frames:
+            return
+        mean = self.frame_sum / frames
+        jitter = max(0.0, self.frame_square_sum / frames - mean * mean) ** 0.5
+        latency = self.latency_sum / self.samples
+        expected = latency + self.interval_sum / self.samples / 2
+        vsync = ' (vsync)' if self.vsync else ''
+        print(f"{self.mode}{vsync}: {frames} frames, frame ms mean {mean:.2f}  jitter (stdev) {jitter:.2f}"
+              f"  p99 {self.percentile(0.99):.1f}")
+        print(f"  input latency ms: sample->present {latency:.2f}  expected press->present {expected:.2f}  worst {self.worst:.2f}")
+
+        # 1 ms buckets around the target frame time, everything else in the end buckets
+        target = round(self.period * 1000)
+        low, high = target - 5, target + 5
+        counts = [0] * (high - low + 1)
+        for index, count in enumerate(self.frame_buckets):
+            counts[min(max(int(index * HISTOGRAM_STEP + 1e-9), low), high) - low] += count
+        scale = 50 / max(counts)
+        for index, count in enumerate(counts):
+            bucket = low + index
+            label = f'<{low + 1}' if bucket == low else f'>={high}' if bucket == high else f'{bucket}'
+            print(f"  {label:>5} ms |{'#' * round(count * scale):<50} {count}")
+
+def compare(frames=600, level_number=1, modes=PACING_MODES, seed=0):
+    # Runs the same scripted level under each mode and prints its report
+    from env import GabeEnv, ACTIONS
+    pygame.display.init()
+    pygame.font.init()
+    for mode in modes:
+        pacer = FramePacer(mode)
+        pacer.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        env = GabeEnv()
+        env.reset(level_number, seed)
+        rng = random.Random(seed)
+        for _ in range(frames):
+            pacer.sample_input()
+            pygame.event.pump()
+            env.step(rng.randrange(len(ACTIONS)))
+            env.level.draw()
+            pygame.display.update()
+            pacer.presented()
+            pacer.tick()
+            if env.level.game_over or env.level.level_complete:
+                env.reset(level_number, seed)
+        env.close()
+        pacer.report()
+        print()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare frame pacing modes')
+    parser.add_argument('--frames', type=int, default=600, help='Frames per mode')
+    parser.add_argument('--level', type=int, default=1, help='Level to run')
+    parser.add_argument('--mode', choices=PACING_MODES, action='append', help='Mode to run (repeatable; default: all)')
+    parser.add_argument('--headless', action='store_true', help='Use the dummy video driver (no vsync)')
+    args = parser.parse_args()
+    if args.headless:
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    compare(args.frames, args.level, args.mode or PACING_MODES)
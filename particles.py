@@ -0,0 +1,188 @@
+import math, time, random, argparse
+from collections import deque
+import pygame
+from settings import *
+
+# Pooled particle effects.
+#
+# Particles are not sprites, and nothing is done per particle per frame.
+# Every emit() picks one of PARTICLE_VARIANTS pre-built templates for its
+# effect: a burst of particles whose whole flight was worked out once, stored
+# as one ready-made fblits() sequence per age, with positions relative to the
+# burst's bounding box. A live burst is just its template's sequences, box
+# position and birth frame in a queue, so spawning past PARTICLE_CAPACITY
+# particles drops the oldest bursts.
+#
+# Drawing a burst is one fblits() of its current sequence onto a subsurface of
+# the display at the burst's box, so the cost is SDL's per-blit cost plus a
+# little per burst. Bursts outside a view are skipped; only bursts crossing a
+# view's edge have their positions shifted in Python.
+
+EFFECTS = {
+    # name: colour, size (px), lifetime range (frames), launch angle range (degrees, 270 = up), speed, gravity, count
+    'sparkle': ((255, 230, 90), 8, (20, 35), (0, 360), 3.0, 0.05, 12),
+    'splash': ((120, 180, 255), 8, (25, 40), (220, 320), 5.0, 0.4, 16),
+    'dust': ((190, 170, 140), 12, (15, 30), (180, 360), 1.5, -0.02, 10),
+    'burst': ((255, 170, 40), 8, (20, 30), (200, 340), 5.0, 0.3, 20),
+}
+FADE_STEPS = 4
+
+effect_frames = {} # name -> surfaces indexed by remaining lifetime
+templates = {} # (name, count) -> PARTICLE_VARIANTS templates
+
+def frames_for(name):
+    # Particles shrink and fade over FADE_STEPS images; built once per effect
+    if name not in effect_frames:
+        color, size, (_, max_life), _, _, _, _ = EFFECTS[name]
+        steps = []
+        for step in range(1, FADE_STEPS + 1):
+            surface = pygame.Surface((size, size), pygame.SRCALPHA)
+            pygame.draw.circle(surface, (*color, 255 * step // FADE_STEPS), (size / 2, size / 2), size * step / FADE_STEPS / 2)
+            steps.append(surface)
+        effect_frames[name] = [steps[min(FADE_STEPS - 1, life * FADE_STEPS // max_life)] for life in range(max_life + 1)]
+    return effect_frames[name]
+
+class Template:
+    # One burst of `count` particles, flown once from its launch point
+    def __init__(self, name, count, rng):
+        color, size, (min_life, max_life), (min_angle, max_angle), speed, gravity, _ = EFFECTS[name]
+        frames = frames_for(name)
+        paths = [] # (lifetime, [(x, y) at each age]) per particle, relative to the launch point
+        for _ in range(count):
+            angle = math.radians(rng.uniform(min_angle, max_angle))
+            velocity = rng.uniform(0.3, 1.0) * speed
+            vx = math.cos(angle) * velocity
+            vy = math.sin(angle) * velocity
+            life = rng.randint(min_life, max_life)
+            # Gravity is added to the velocity before each move, so after `age` frames a
+            # particle has fallen age * (age + 1) / 2 * gravity beyond its launch velocity
+            paths.append((life, [(vx * age - size / 2, (vy + gravity * (age + 1) / 2) * age - size / 2) for age in range(life)]))
+        points = [point for _, path in paths for point in path]
+        left = math.floor(min(x for x, _ in points))
+        top = math.floor(min(y for _, y in points))
+        self.offset = (left, top) # Box corner relative to the launch point
+        self.size = (math.ceil(max(x for x, _ in points)) + size - left, math.ceil(max(y for _, y in points)) + size - top)
+        self.life = max(life for life, _ in paths)
+        self.count = count
+        # ages[age] = fblits() sequence for the particles still alive at that age
+        self.ages = [[(frames[life - age], (int(path[age][0] - left), int(path[age][1] - top)))
+                      for life, path in paths if age < life]
+                     for age in range(self.life)]
+
+def templates_for(name, count):
+    # Built on first use from a fixed seed, so every run shows the same variants
+    key = (name, count)
+    if key not in templates:
+        rng = random.Random(f'{name} {count}')
+        templates[key] = [Template(name, count, rng) for _ in range(PARTICLE_VARIANTS)]
+    return templates[key]
+
+def draw_bursts(surface, bursts):
+    # Draws what ParticleSystem.view_bursts() returned for a view of surface
+    for rect, blits in bursts:
+        surface.subsurface(rect).fblits(blits)
+
+class ParticleSystem:
+    def __init__(self, capacity=PARTICLE_CAPACITY):
+        self.capacity = capacity
+        # (template ages, box left, box top, box width, box height, birth frame, particles), oldest first
+        self.bursts = deque()
+        self.emitted = 0 # Particles in self.bursts, counting those already gone
+        self.frame = 1
+        self.random = random.Random() # Private, so effects never shift a seeded game's random stream
+
+    def emit(self, name, pos, count=None):
+        template = self.random.choice(templates_for(name, EFFECTS[name][6] if count is None else count))
+        left = int(pos[0]) + template.offset[0]
+        top = int(pos[1]) + template.offset[1]
+        self.bursts.append((template.ages, left, top, *template.size, self.frame, template.count))
+        self.emitted += template.count
+        while self.emitted > self.capacity:
+            self.emitted -= self.bursts.popleft()[6]
+
+    def update(self):
+        self.frame += 1
+        # Drop finished bursts off the old end; a shorter one behind an older one waits its turn
+        bursts = self.bursts
+        while bursts and bursts[0][5] + len(bursts[0][0]) <= self.frame:
+            self.emitted -= bursts.popleft()[6]
+
+    def live_count(self):
+        frame = self.frame
+        return sum(len(ages[frame - born]) for ages, _, _, _, _, born, _ in self.bursts if frame - born < len(ages))
+
+    def view_bursts(self, offset, view):
+        # (display rect, fblits() sequence) for every burst in view; offset turns world into display positions
+        frame = self.frame
+        offset_x, offset_y = int(offset[0]), int(offset[1])
+        view_left, view_top, view_right, view_bottom = view.left, view.top, view.right, view.bottom
+        bursts = []
+        for ages, left, top, width, height, born, _ in self.bursts:
+            age = frame - born
+            if age >= len(ages):
+                continue
+            x = left - offset_x
+            y = top - offset_y
+            right = x + width
+            bottom = y + height
+            if right <= view_left or x >= view_right or bottom <= view_top or y >= view_bottom:
+                continue
+            # Cut the box down to the view; the subsurface must stay inside it
+            if right > view_right:
+                width = view_right - x
+            if bottom > view_bottom:
+                height = view_bottom - y
+            if x >= view_left and y >= view_top:
+                bursts.append(((x, y, width, height), ages[age]))
+            else:
+                # Crossing the view's left or top edge moves the box corner, so the particles move with it
+                shift_x = min(0, x - view_left)
+                shift_y = min(0, y - view_top)
+                bursts.append(((x - shift_x, y - shift_y, width + shift_x, height + shift_y),
+                               [(image, (particle_x + shift_x, particle_y + shift_y)) for image, (particle_x, particle_y) in ages[age]]))
+        return bursts
+
+    def clear(self):
+        self.bursts.clear()
+        self.emitted = 0
+
+def benchmark(live=3000, frames=300, views=1):
+    # Update + draw cost per frame with `live` particles kept alive, split over
+    # `views` side-by-side viewports like co-op
+    from env import init_headless
+    init_headless()
+    screen = pygame.display.get_surface()
+    system = ParticleSystem(max(PARTICLE_CAPACITY, live))
+    width = SCREEN_WIDTH // views
+    viewports = [pygame.Rect(width * index, 0, width, SCREEN_HEIGHT) for index in range(views)]
+    # Coin-sized sparkle bursts; they live 20-35 frames, so this keeps about `live` alive
+    per_frame = live / 30 / EFFECTS['sparkle'][6]
+    update_time = draw_time = 0.0
+    alive = 0
+    owed = 0.0
+    for _ in range(frames):
+        owed += per_frame
+        while owed >= 1:
+            system.emit('sparkle', (system.random.uniform(0, SCREEN_WIDTH), system.random.uniform(0, SCREEN_HEIGHT)))
+            owed -= 1
+        start = time.perf_counter()
+        system.update()
+        update_time += time.perf_counter() - start
+        start = time.perf_counter()
+        for viewport in viewports:
+            # Every view follows the same camera, as when both players stand together
+            screen.set_clip(viewport)
+            draw_bursts(screen, system.view_bursts((-viewport.x, 0), viewport))
+        screen.set_clip(None)
+        draw_time += time.perf_counter() - start
+        alive += system.live_count()
+    print(f"{alive / frames:.0f} live particles, {views} view{'s' if views > 1 else ''}: update {update_time / frames * 1000:.3f} ms, "
+          f"draw {draw_time / frames * 1000:.3f} ms, total {(update_time + draw_time) / frames * 1000:.3f} ms per frame")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Particle system benchmark')
+    parser.add_argument('--live', type=int, default=3000, help='Particles to keep alive')
+    parser.add_argument('--frames', type=int, default=300, help='Frames to run')
+    parser.add_argument('--views', type=int, default=1, help='Side-by-side viewports to draw, as in co-op')
+    args = parser.parse_args()
+    benchmark(args.live, args.frames, args.views)
@@ -1,10 +1,35 @@
 import pygame
 from settings import *
+from assets import load_processed
+import audio
+from collision import push_responses, head_hit_responses
+
+# Second local player: the controls the player reads -> the key that drives them
+PLAYER_TWO_KEYS = {
+    pygame.K_RIGHT: pygame.K_d,
+    pygame.K_LEFT: pygame.K_a,
+    pygame.K_UP: pygame.K_w,
+    pygame.K_DOWN: pygame.K_s,
+    pygame.K_SPACE: pygame.K_f,
+    pygame.K_LSHIFT: pygame.K_g,
+    pygame.K_RSHIFT: pygame.K_g,
+}
+
+class RemappedKeys:
+    # Key state as seen through a keymap, so input() keeps reading the default keys
+    def __init__(self, keys, keymap):
+        self.keys = keys
+        self.keymap = keymap
+
+    def __getitem__(self, key):
+        return self.keys[self.keymap.get(key, key)]
 
 class Player(pygame.sprite.Sprite):
-    def __init__(self, pos, groups, obstacle_sprites):
+    def __init__(self, pos, groups, obstacle_sprites, character='purple', keymap=None):
         super().__init__(groups)
         # Asset loading
+        self.character = character
+        self.keymap = keymap
         self.import_assets()
         self.frame_index = 0
         self.animation_speed = 0.15
@@ -29,28 +54,39 @@ class Player(pygame.sprite.Sprite):
         self.health = START_HEALTH
         self.is_hurt = False
         self.hurt_time = 0
+        self.damage_cause = None # What last hurt this player, for the DEATH telemetry event
         self.in_water = False
         self.climbing = False
         self.ladder_jump_timer = 0
+        
+        # Input & time sources (replaced by env.py to drive the player without a keyboard)
+        self.controls = None
+        self.get_ticks = pygame.time.get_ticks
 
     def import_assets(self):
-        # We'll use the purple character for Gabe
+        # Gabe is the purple character; a second player picks another colour
         self.animations = {'idle': [], 'walk': [], 'jump': [], 'fall': [], 'climb': []}
+        self.flipped_animations = {name: [] for name in self.animations}
+        self.frame_sources = {} # id(frame) -> (path, size, flip) it was copied from, for memory_report
         
+        name = f'character_{self.character}'
         raw_assets = {
-            'idle': ['character_purple_idle.png', 'character_purple_front.png'],
-            'walk': ['character_purple_walk_a.png', 'character_purple_walk_b.png'],
-            'jump': ['character_purple_jump.png'],
-            'fall': ['character_purple_jump.png'],
-            'climb': ['character_purple_climb_a.png', 'character_purple_climb_b.png']
+            'idle': [f'{name}_idle.png', f'{name}_front.png'],
+            'walk': [f'{name}_walk_a.png', f'{name}_walk_b.png'],
+            'jump': [f'{name}_jump.png'],
+            'fall': [f'{name}_jump.png'],
+            'climb': [f'{name}_climb_a.png', f'{name}_climb_b.png']
         }
         
         for animation_name, files in raw_assets.items():
             for filename in files:
-                image = pygame.image.load(f'{PLAYER_ASSETS}/{filename}').convert_alpha()
+                path = f'{PLAYER_ASSETS}/{filename}'
                 # Scale down slightly to 96x96 (1.5x tile size)
-                scaled_image = pygame.transform.scale(image, (96, 96))
-                self.animations[animation_name].append(scaled_image)
+                # Each player gets its own copies since flicker() changes frame alpha
+                for flip, frames in ((False, self.animations), (True, self.flipped_animations)):
+                    frame = load_processed(path, (96, 96), flip=flip).copy()
+                    self.frame_sources[id(frame)] = (path, (96, 96), flip)
+                    frames[animation_name].append(frame)
 
     def animate(self):
         animation = self.animations[self.status]
@@ -64,11 +100,10 @@ class Player(pygame.sprite.Sprite):
             if self.frame_index >= len(animation):
                 self.frame_index = 0
             
-        image = animation[int(self.frame_index)]
         if self.facing_right:
-            self.image = image
+            self.image = animation[int(self.frame_index)]
         else:
-            self.image = pygame.transform.flip(image, True, False)
+            self.image = self.flipped_animations[self.status][int(self.frame_index)]
 
     def get_status(self):
         if self.climbing:
@@ -84,7 +119,9 @@ class Player(pygame.sprite.Sprite):
                 self.status = 'idle'
 
     def input(self):
-        keys = pygame.key.get_pressed()
+        keys = self.controls if self.controls is not None else pygame.key.get_pressed()
+        if self.keymap:
+            keys = RemappedKeys(keys, self.keymap)
         
         if keys[pygame.K_RIGHT]:
             self.direction.x = 1
@@ -106,7 +143,7 @@ class Player(pygame.sprite.Sprite):
             elif self.in_water:
                 self.swim()
             
-        if self.climbing and not (pygame.time.get_ticks() - self.ladder_jump_timer < 200):
+        if self.climbing and not (self.get_ticks() - self.ladder_jump_timer < 200):
             if keys[pygame.K_UP]:
                 self.direction.y = -1
             elif keys[pygame.K_DOWN]:
@@ -124,9 +161,10 @@ class Player(pygame.sprite.Sprite):
 
     def jump(self):
         if self.climbing:
-            self.ladder_jump_timer = pygame.time.get_ticks()
+            self.ladder_jump_timer = self.get_ticks()
             self.climbing = False
         self.direction.y = self.jump_speed
+        audio.play('jump')
 
     def swim(self):
         # Regular swim
@@ -142,24 +180,16 @@ class Player(pygame.sprite.Sprite):
         
         for sprite in self.obstacle_sprites:
             if sprite.rect.colliderect(check_hitbox):
-                # Check for movable boxes
-                if hasattr(sprite, 'sprite_type') and sprite.sprite_type == 'box':
-                    # If player is pushing the box
-                    if self.direction.x > 0: # Pushing right
-                        if sprite.push(pygame.math.Vector2(1, 0)):
-                            self.hitbox.right = sprite.rect.left
-                        else:
-                            self.hitbox.right = sprite.rect.left
-                    elif self.direction.x < 0: # Pushing left
-                        if sprite.push(pygame.math.Vector2(-1, 0)):
-                            self.hitbox.left = sprite.rect.right
-                        else:
-                            self.hitbox.left = sprite.rect.right
-                else:
-                    if self.direction.x > 0: # Moving right
-                        self.hitbox.right = sprite.rect.left
-                    elif self.direction.x < 0: # Moving left
-                        self.hitbox.left = sprite.rect.right
+                # Obstacles that react to being walked into (e.g. boxes get pushed)
+                response = push_responses.get(sprite.sprite_type)
+                if self.direction.x > 0: # Moving right
+                    if response:
+                        response(sprite, pygame.math.Vector2(1, 0))
+                    self.hitbox.right = sprite.rect.left
+                elif self.direction.x < 0: # Moving left
+                    if response:
+                        response(sprite, pygame.math.Vector2(-1, 0))
+                    self.hitbox.left = sprite.rect.right
                 
         self.rect.centerx = self.hitbox.centerx
 
@@ -178,8 +208,9 @@ class Player(pygame.sprite.Sprite):
                     self.hitbox.top = sprite.rect.bottom
                     self.rect.top = self.hitbox.top - (self.rect.height - self.hitbox.height) // 2
                     self.direction.y = 0
-                    if hasattr(sprite, 'hit'):
-                        sprite.hit()
+                    response = head_hit_responses.get(sprite.sprite_type)
+                    if response:
+                        response(sprite)
                 else: # Standing still but overlapping
                     if self.hitbox.centery < sprite.rect.centery:
                         self.hitbox.bottom = sprite.rect.top
@@ -198,19 +229,22 @@ class Player(pygame.sprite.Sprite):
         if not self.is_hurt:
             self.health -= 1
             self.is_hurt = True
-            self.hurt_time = pygame.time.get_ticks()
+            self.hurt_time = self.get_ticks()
+            audio.play('hurt')
             # Knockback? (optional)
             self.direction.y = -10 
+            return True
+        return False
 
     def invincibility_timer(self):
         if self.is_hurt:
-            current_time = pygame.time.get_ticks()
+            current_time = self.get_ticks()
             if current_time - self.hurt_time >= HURT_COOLDOWN:
                 self.is_hurt = False
 
     def flicker(self):
         if self.is_hurt:
-            value = pygame.time.get_ticks() % 200
+            value = self.get_ticks() % 200
             if value < 100:
                 self.image.set_alpha(0)
             else:
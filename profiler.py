@@ -0,0 +1,123 @@
+import os, sys, time, json, cProfile, threading
+import pygame
+from settings import *
+
+# On-demand profiling of the running game (--profile / F10).
+#
+# While a capture runs, a sampler thread reads the game thread's stack (and the
+# render thread's, in --pipelined mode) every PROFILE_SAMPLE_INTERVAL seconds
+# and counts identical stacks, and cProfile traces the game thread. When it
+# ends three files share one name:
+#
+#   <time>_level<N>.collapsed  one "root;caller;callee count" line per stack,
+#                              for flamegraph.pl, speedscope or inferno
+#   <time>_level<N>.pstats     cProfile output (python -m pstats, snakeviz)
+#   <time>_level<N>.json       level, sprite counts per group, frame time stats
+#
+# cProfile's tracing slows Python-heavy code while capturing, so frame times in
+# a capture run somewhat higher than in normal play. Nothing is started until
+# a capture is requested; between captures the game loop only checks for one.
+
+def group_counts(level):
+    # Sprites in every sprite group the level owns, by attribute name
+    return {name: len(value) for name, value in vars(level).items() if isinstance(value, pygame.sprite.AbstractGroup)}
+
+def frame_stats(frame_times):
+    if not frame_times:
+        return {'frames': 0}
+    ordered = sorted(frame_times)
+    frames = len(ordered)
+    budget = 1000 / FPS
+    return {
+        'frames': frames,
+        'mean_ms': round(sum(ordered) / frames, 3),
+        'p50_ms': round(ordered[frames // 2], 3),
+        'p95_ms': round(ordered[min(frames - 1, int(frames * 0.95))], 3),
+        'p99_ms': round(ordered[min(frames - 1, int(frames * 0.99))], 3),
+        'max_ms': round(ordered[-1], 3),
+        # Frames that took at least half a frame longer than the FPS budget
+        'slow_frames': sum(1 for value in ordered if value > budget * 1.5),
+    }
+
+def frame_name(frame):
+    code = frame.f_code
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+class ProfileCapture:
+    def __init__(self, directory, level, seconds=PROFILE_SECONDS, interval=PROFILE_SAMPLE_INTERVAL):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}_level{level.level_number}")
+        self.level_number = level.level_number
+        self.start_counts = group_counts(level)
+        self.seconds = seconds
+        self.interval = interval
+
+        self.stacks = {} # collapsed stack -> samples
+        self.samples = 0
+        self.frame_times = [] # ms per game loop iteration
+        self.game_thread = threading.get_ident()
+
+        self.stopping = threading.Event()
+        self.sampler = threading.Thread(target=self.sample, name='profile sampler', daemon=True)
+        self.profile = cProfile.Profile()
+        self.start = self.last_frame = time.perf_counter()
+        self.profile.enable() # Traces only the thread that calls enable(): the game thread
+        self.sampler.start()
+        print(f"Profiling level {self.level_number} for {seconds:g} s")
+
+    def sampled_threads(self):
+        # The game thread, plus the render thread when the pipeline is on
+        threads = {self.game_thread: 'game'}
+        for thread in threading.enumerate():
+            if thread.name.startswith('render'):
+                threads[thread.ident] = 'render'
+        return threads
+
+    def sample(self):
+        while not self.stopping.wait(self.interval):
+            frames = sys._current_frames()
+            for ident, root in self.sampled_threads().items():
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                names = []
+                while frame:
+                    names.append(frame_name(frame))
+                    frame = frame.f_back
+                names.append(root)
+                stack = ';'.join(reversed(names))
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+            self.samples += 1
+
+    def frame(self):
+        # Call once per game loop iteration; returns True once the capture time is up
+        now = time.perf_counter()
+        self.frame_times.append((now - self.last_frame) * 1000)
+        self.last_frame = now
+        return now - self.start >= self.seconds
+
+    def stop(self, level):
+        self.profile.disable()
+        self.stopping.set()
+        self.sampler.join()
+        elapsed = time.perf_counter() - self.start
+
+        with open(f'{self.path}.collapsed', 'w') as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f'{stack} {count}\n')
+        self.profile.dump_stats(f'{self.path}.pstats')
+        stats = frame_stats(self.frame_times)
+        summary = {
+            'level': self.level_number,
+            'end_level': level.level_number,
+            'seconds': round(elapsed, 3),
+            'sample_interval': self.interval,
+            'samples': self.samples,
+            'frame_times': stats,
+            'sprites_at_start': self.start_counts,
+            'sprites_at_end': group_counts(level),
+        }
+        with open(f'{self.path}.json', 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"Profile saved to {self.path}.* ({self.samples} samples, {stats['frames']} frames"
+              + (f", p99 {stats['p99_ms']:.1f} ms)" if stats['frames'] else ")"))
@@ -30,3 +30,48 @@ ASSET_PATH = 'kenney_new-platformer-pack-1/Sprites'
 PLAYER_ASSETS = f'{ASSET_PATH}/Characters/Default'
 TILE_ASSETS = f'{ASSET_PATH}/Tiles/Default'
 BACKGROUND_ASSETS = f'{ASSET_PATH}/Backgrounds/Default'
+SOUND_ASSETS = 'kenney_new-platformer-pack-1/Sounds'
+ASSET_CACHE_DIR = 'cache/assets' # processed (scaled/flipped) images, one subdirectory per cache version
+
+# Level streaming
+CHUNK_WIDTH = 32 # tiles per column chunk
+MAP_WATCH_INTERVAL = 250 # ms between maps.txt checks in --watch mode
+
+# Audio
+SOUND_CHANNELS = 8 # fixed mixer channel pool
+SOUND_VOICE_LIMIT = 2 # max simultaneous voices of one effect
+SOUND_COOLDOWN = 60 # ms before the same effect can start again
+SOUND_VOLUME = 0.5
+
+# Telemetry (--telemetry)
+TELEMETRY_DIR = 'telemetry'
+TELEMETRY_BUFFER_EVENTS = 8192 # ring buffer slots
+TELEMETRY_FLUSH_INTERVAL = 1.0 # seconds between background flushes
+TELEMETRY_MAX_BYTES = 4 * 1024 * 1024 # rotate session files at this size
+
+# Frame capture (--capture / F9)
+CAPTURE_DIR = 'captures'
+CAPTURE_POOL_SIZE = 8 # pooled frame surfaces; frames are dropped when all are busy
+CAPTURE_WORKERS = 2 # PNG encoder threads (raw video always uses one)
+CAPTURE_PNG_COMPRESSION = 1 # zlib level for PNG frames; higher is smaller but slower to encode
+
+# On-demand profiler (--profile / F10)
+PROFILE_DIR = 'profiles'
+PROFILE_SECONDS = 10 # capture length when F10 starts one
+PROFILE_SAMPLE_INTERVAL = 0.005 # seconds between stack samples
+
+# Memory budget checked by --memory-report (per level, at peak)
+LEVEL_MEMORY_BUDGET_MB = 64
+
+# Level select minimaps
+THUMBNAIL_DIR = 'cache/thumbnails'
+THUMBNAIL_SIZE = (288, 128)
+THUMBNAIL_COLUMNS = 4
+
+# Frame pacing (--pacing)
+LATE_LATCH_MARGIN = 0.002 # seconds of slack left before the present in 'late' mode
+
+# Particle effects
+PARTICLE_CAPACITY = 4096 # live particles per level; past it the oldest bursts are dropped first
+PARTICLE_VARIANTS = 8 # pre-built bursts per effect; each emit picks one
+BOX_DUST_SPEED = 4 # boxes landing faster than this (px/frame) kick up dust
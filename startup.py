@@ -0,0 +1,43 @@
+import time, threading
+from contextlib import contextmanager
+
+# Startup-time profiling for --profile-startup.
+# Sections nest; each one records only its own (exclusive) time, so
+# "sprite construction" doesn't also count the PNG decodes done inside it.
+
+enabled = False
+timings = {}
+process_start = time.perf_counter()
+_local = threading.local()
+
+@contextmanager
+def section(name):
+    if not enabled:
+        yield
+        return
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    start = time.perf_counter()
+    stack.append(0.0) # Time spent in child sections
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        child_time = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+        if threading.current_thread() is not threading.main_thread():
+            name = f'{name} (background)'
+        timings[name] = timings.get(name, 0.0) + elapsed - child_time
+
+def record(name, seconds):
+    if enabled:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+def report():
+    total = time.perf_counter() - process_start
+    print('Startup profile:')
+    for name, seconds in sorted(timings.items(), key=lambda item: -item[1]):
+        print(f'  {name:<32} {seconds * 1000:8.1f} ms')
+    print(f'  {"time to first playable frame":<32} {total * 1000:8.1f} ms')
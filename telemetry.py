@@ -0,0 +1,204 @@
+import os, sys, glob, time, struct, atexit, argparse, threading
+from settings import *
+
+# Gameplay telemetry.
+#
+# The game loop packs fixed-size events into a preallocated ring buffer; a
+# background thread batch-flushes them to an append-only session file and
+# rotates it once it reaches TELEMETRY_MAX_BYTES. Until start() is called,
+# record() is a no-op.
+#
+# File layout: MAGIC, then EVENT records back to back:
+#   type (u8), cause (u8), level (u16), time since session start in ms (u32), x, y, value (f32)
+#
+#   FRAME           value = frame time (ms, incl. sleep), x = work time (ms, input sample to present)
+#   LEVEL_START     -
+#   DEATH           cause, x/y = player position
+#   COIN            one per coin picked up: x/y = player position, value = 1
+#   LUCKY_HIT       x/y = block position
+#   LEVEL_COMPLETE  value = seconds since the level started
+
+MAGIC = b'GABETLM1'
+EVENT = struct.Struct('<BBHIfff')
+
+FRAME, LEVEL_START, DEATH, COIN, LUCKY_HIT, LEVEL_COMPLETE = range(1, 7)
+EVENT_NAMES = {FRAME: 'frame', LEVEL_START: 'level_start', DEATH: 'death', COIN: 'coin', LUCKY_HIT: 'lucky_hit', LEVEL_COMPLETE: 'level_complete'}
+CAUSES = {'hazard': 1, 'enemy': 2, 'fall': 3}
+CAUSE_NAMES = {code: name for name, code in CAUSES.items()}
+
+class Recorder:
+    def __init__(self, directory, capacity=TELEMETRY_BUFFER_EVENTS, flush_interval=TELEMETRY_FLUSH_INTERVAL, max_bytes=TELEMETRY_MAX_BYTES):
+        self.directory = directory
+        self.capacity = capacity
+        self.buffer = bytearray(capacity * EVENT.size)
+        self.head = 0 # Only written by the game loop
+        self.tail = 0 # Only written by the writer thread
+        self.dropped = 0
+        self.level = 0
+        self.start_time = time.perf_counter()
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+
+        os.makedirs(directory, exist_ok=True)
+        self.session = time.strftime('%Y%m%d-%H%M%S') + f'-{os.getpid()}'
+        self.part = 0
+        self.file = None
+        self.open_file()
+
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self.writer, daemon=True)
+        self.thread.start()
+
+    def record(self, event_type, cause=0, x=0.0, y=0.0, value=0.0):
+        head = self.head
+        if head - self.tail >= self.capacity:
+            # Writer has fallen a whole buffer behind; drop rather than overwrite unread events
+            self.dropped += 1
+            return
+        EVENT.pack_into(self.buffer, (head % self.capacity) * EVENT.size, event_type, cause, self.level,
+                        int((time.perf_counter() - self.start_time) * 1000), x, y, value)
+        self.head = head + 1
+
+    def open_file(self):
+        suffix = f'.{self.part}' if self.part else ''
+        path = os.path.join(self.directory, f'session-{self.session}{suffix}.tlm')
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+
+    def flush(self):
+        head = self.head
+        tail = self.tail
+        if head == tail:
+            return
+        start = (tail % self.capacity) * EVENT.size
+        end = (head % self.capacity) * EVENT.size
+        if end > start:
+            self.file.write(self.buffer[start:end])
+        else:
+            # Wrapped around the end of the ring
+            self.file.write(self.buffer[start:])
+            self.file.write(self.buffer[:end])
+        self.file.flush()
+        self.tail = head
+
+        if self.file.tell() >= self.max_bytes:
+            self.file.close()
+            self.part += 1
+            self.open_file()
+
+    def writer(self):
+        while not self.stopping.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    def stop(self):
+        self.stopping.set()
+        self.thread.join()
+        self.file.close()
+        if self.dropped:
+            print(f"Telemetry dropped {self.dropped} events")
+
+recorder = None
+
+def start(directory=TELEMETRY_DIR):
+    global recorder
+    if recorder is None:
+        recorder = Recorder(directory)
+        atexit.register(stop)
+    return recorder
+
+def stop():
+    global recorder
+    if recorder is not None:
+        recorder.stop()
+        recorder = None
+
+def record(event_type, cause=0, x=0.0, y=0.0, value=0.0):
+    if recorder is not None:
+        recorder.record(event_type, cause, x, y, value)
+
+def level_started(level_number):
+    if recorder is not None:
+        recorder.level = level_number
+        recorder.record(LEVEL_START)
+
+# Offline tools
+
+def read_events(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} is not a telemetry file")
+    body = memoryview(data)[len(MAGIC):]
+    body = body[:len(body) - len(body) % EVENT.size] # Ignore a torn final record
+    return EVENT.iter_unpack(body)
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def aggregate(paths):
+    frame_times = []
+    work_times = []
+    deaths = {}
+    coins = {}
+    lucky_hits = {}
+    completions = {}
+    files = 0
+    for path in paths:
+        files += 1
+        for event_type, cause, level, _, x, y, value in read_events(path):
+            if event_type == FRAME:
+                frame_times.append(value)
+                work_times.append(x)
+            elif event_type == DEATH:
+                key = (level, CAUSE_NAMES.get(cause, 'unknown'))
+                deaths[key] = deaths.get(key, 0) + 1
+            elif event_type == COIN:
+                coins[level] = coins.get(level, 0) + int(value)
+            elif event_type == LUCKY_HIT:
+                lucky_hits[level] = lucky_hits.get(level, 0) + 1
+            elif event_type == LEVEL_COMPLETE:
+                completions.setdefault(level, []).append(value)
+
+    print(f"Files: {files}")
+    if frame_times:
+        print(f"Frames: {len(frame_times)}  frame ms mean {sum(frame_times) / len(frame_times):.2f}"
+              f"  p95 {percentile(frame_times, 0.95):.1f}  p99 {percentile(frame_times, 0.99):.1f}"
+              f"  work ms mean {sum(work_times) / len(work_times):.2f}")
+    for level in sorted(set([level for level, _ in deaths] + list(coins) + list(lucky_hits) + list(completions))):
+        level_deaths = ', '.join(f'{cause} {count}' for (death_level, cause), count in sorted(deaths.items()) if death_level == level)
+        times = completions.get(level, [])
+        completion = f"{len(times)} completions, mean {sum(times) / len(times):.1f}s" if times else "0 completions"
+        print(f"Level {level}: deaths [{level_deaths}]  coins {coins.get(level, 0)}  lucky hits {lucky_hits.get(level, 0)}  {completion}")
+
+def benchmark(count=200000):
+    # Cost of record() on the game loop thread, with the writer running
+    import tempfile
+    with tempfile.TemporaryDirectory() as directory:
+        bench = Recorder(directory, capacity=count, flush_interval=0.05)
+        start_time = time.perf_counter()
+        for _ in range(count):
+            bench.record(FRAME, 0, 16.0, 0.0, 16.7)
+        elapsed = time.perf_counter() - start_time
+        bench.stop()
+    print(f"record(): {elapsed / count * 1e9:.0f} ns per event, {bench.dropped} dropped")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Gabe Adventure telemetry tools')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    aggregate_parser = subparsers.add_parser('aggregate', help='Summarize one or more session files')
+    aggregate_parser.add_argument('paths', nargs='*', help=f'Session files (default: {TELEMETRY_DIR}/*.tlm)')
+    subparsers.add_parser('bench', help='Measure record() overhead')
+    args = parser.parse_args()
+
+    if args.command == 'aggregate':
+        paths = args.paths or sorted(glob.glob(os.path.join(TELEMETRY_DIR, '*.tlm')))
+        if not paths:
+            sys.exit("No telemetry files found")
+        aggregate(paths)
+    else:
+        benchmark()
@@ -0,0 +1,138 @@
+import os, hashlib, multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import pygame
+from settings import *
+from level import BIOME_BACKGROUNDS
+
+# Level-select minimaps.
+#
+# Thumbnails are drawn straight from a level's tile grid - one pixel per tile,
+# scaled up over the biome background - without building any sprites. Missing
+# ones are rendered in a process pool and saved as PNGs named by a hash of the
+# level's content, so editing a level re-renders only that level and the menu
+# itself only ever loads small files from disk.
+
+# Bump when the drawing below changes so old thumbnails are re-rendered
+THUMBNAIL_VERSION = 1
+
+TERRAIN_COLORS = {
+    'grass': (70, 120, 40),
+    'forest': (70, 120, 40),
+    'desert': (222, 190, 120),
+    'stone': (100, 100, 115),
+    'mushroom': (150, 90, 170),
+    'snow': (150, 175, 210),
+}
+
+CELL_COLORS = {
+    'S': (220, 40, 40),    # Spikes
+    'L': (255, 120, 0),    # Lava
+    'W': (40, 110, 230),   # Water
+    'C': (255, 215, 0),    # Coin
+    'B': (150, 100, 50),   # Box
+    '?': (230, 170, 60),   # Lucky block
+    '#': (170, 120, 60),   # Ladder
+    'H': (255, 80, 120),   # Heart
+    'X': (60, 20, 60),     # Enemy
+    'Y': (60, 20, 60),     # Follower enemy
+    '1': (60, 220, 60),    # Start
+    'E': (255, 255, 255),  # Exit
+}
+
+def content_hash(biome, map_data, size=THUMBNAIL_SIZE):
+    # Trailing spaces don't change the level, so they don't change the thumbnail either
+    text = f'{THUMBNAIL_VERSION} {size[0]}x{size[1]} {biome}\n' + '\n'.join(row.rstrip() for row in map_data)
+    return hashlib.sha1(text.encode()).hexdigest()
+
+backgrounds = {} # Per process: (background file, size) -> scaled surface
+
+def thumbnail_background(biome, size):
+    bg_file = BIOME_BACKGROUNDS.get(biome, 'background_solid_sky.png')
+    key = (bg_file, size)
+    if key not in backgrounds:
+        try:
+            image = pygame.image.load(f'{BACKGROUND_ASSETS}/{bg_file}')
+            # No display to convert() against; smoothscale still needs 32-bit pixels
+            pixels = pygame.Surface(image.get_size(), 0, 32)
+            pixels.blit(image, (0, 0))
+            backgrounds[key] = pygame.transform.smoothscale(pixels, size)
+        except (pygame.error, FileNotFoundError):
+            backgrounds[key] = None
+    return backgrounds[key]
+
+def render(biome, map_data, size=THUMBNAIL_SIZE):
+    # Needs no display, so it runs in worker processes
+    thumbnail = pygame.Surface(size)
+    background = thumbnail_background(biome, size)
+    if background:
+        thumbnail.blit(background, (0, 0))
+    else:
+        thumbnail.fill(BG_COLOR)
+
+    columns = max((len(row) for row in map_data), default=0)
+    if not columns:
+        return thumbnail
+    grid = pygame.Surface((columns, len(map_data)), pygame.SRCALPHA)
+    terrain = TERRAIN_COLORS.get(biome, TERRAIN_COLORS['grass'])
+    for y, row in enumerate(map_data):
+        for x, cell in enumerate(row):
+            color = terrain if cell == '-' else CELL_COLORS.get(cell)
+            if color:
+                grid.set_at((x, y), color)
+
+    # Whole level fits the thumbnail, ground at the bottom edge
+    scale = min(size[0] / columns, size[1] / len(map_data))
+    grid = pygame.transform.scale(grid, (max(1, int(columns * scale)), max(1, int(len(map_data) * scale))))
+    thumbnail.blit(grid, grid.get_rect(midbottom=(size[0] // 2, size[1])))
+    return thumbnail
+
+def render_to_file(path, biome, map_data, size):
+    # Written under a temporary name so a half-saved PNG is never picked up
+    temp_path = f'{path}.{os.getpid()}.png'
+    pygame.image.save(render(biome, map_data, size), temp_path)
+    os.replace(temp_path, path)
+
+class ThumbnailCache:
+    def __init__(self, directory=THUMBNAIL_DIR, size=THUMBNAIL_SIZE):
+        self.directory = directory
+        self.size = size
+        self.pool = None # Only started when something needs rendering
+        self.pending = {} # path -> future
+        self.surfaces = {} # path -> loaded Surface
+
+    def request(self, biome, map_data):
+        # Returns the path the thumbnail will be at; renders it in the pool if it isn't on disk yet
+        path = os.path.join(self.directory, content_hash(biome, map_data, self.size) + '.png')
+        if path in self.surfaces or path in self.pending or os.path.exists(path):
+            return path
+        if self.pool is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self.pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context('spawn'))
+        self.pending[path] = self.pool.submit(render_to_file, path, biome, map_data, self.size)
+        return path
+
+    def ready(self, path):
+        future = self.pending.get(path)
+        return future is None or future.done()
+
+    def get(self, path):
+        # Loaded on first draw; None while the thumbnail is still rendering
+        if path not in self.surfaces:
+            future = self.pending.get(path)
+            if future:
+                if not future.done():
+                    return None
+                del self.pending[path]
+                if future.exception():
+                    self.surfaces[path] = None
+                    return None
+            try:
+                self.surfaces[path] = pygame.image.load(path).convert()
+            except (pygame.error, FileNotFoundError):
+                self.surfaces[path] = None
+        return self.surfaces[path]
+
+    def shutdown(self):
+        if self.pool:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None